@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# bench.py
+#
+# Copyright (C) 2012, 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-pptx and is released under
+# the MIT License: http://www.opensource.org/licenses/mit-license.php
+
+"""
+Time the load, mutate, and save hot paths of python-pptx against a synthetic
+deck and write the results as JSON.
+
+Usage::
+
+    python benchmarks/bench.py --out results.json
+    python benchmarks/bench.py --baseline baseline.json --threshold 0.10
+
+When *--baseline* is given, each benchmark is compared to the same benchmark
+in the baseline file and the exit status is 1 if any of them is slower by
+more than *--threshold* (a fraction, 0.10 means 10%).
+"""
+
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+
+from optparse import OptionParser
+from StringIO import StringIO
+from timeit import default_timer
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+import deckgen
+
+import pptx
+import pptx.packaging
+
+from pptx import Presentation
+from pptx.presentation import Package
+from pptx.util import Inches
+
+
+def peak_rss_kb():
+    """
+    Peak resident set size of this process in kilobytes, or None where the
+    platform can't report it.
+    """
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on OS X and kilobytes everywhere else
+    if sys.platform == 'darwin':
+        return maxrss // 1024
+    return maxrss
+
+
+# ============================================================================
+# Benchmarks
+# ============================================================================
+#
+# Each benchmark takes the run parameters and the path of the synthetic deck
+# and returns a callable; the callable is the thing timed. Setup done in the
+# benchmark function itself is not timed.
+
+def bench_package_open(params, deck_path):
+    def run():
+        pptx.packaging.Package().open(deck_path)
+    return run
+
+
+def bench_presentation_open(params, deck_path):
+    def run():
+        Presentation(deck_path)
+    return run
+
+
+def bench_presentation_open_threaded(params, deck_path):
+    # parse on one thread per CPU, starting the parser threads untimed
+    saved_parse_threads = Package.parse_threads
+    Package.parse_threads = None
+    Presentation(deck_path)
+
+    def run():
+        try:
+            Presentation(deck_path)
+        finally:
+            Package.parse_threads = saved_parse_threads
+    return run
+
+
+def bench_add_slide(params, deck_path):
+    prs = Presentation()
+    layout = prs.slidelayouts[0]
+
+    def run():
+        for idx in range(params.slides):
+            prs.slides.add_slide(layout)
+    return run
+
+
+def bench_add_textbox(params, deck_path):
+    prs = Presentation()
+    prs.slides.add_slide(prs.slidelayouts[deckgen.BLANK_LAYOUT_IDX])
+    count = params.slides * params.shapes
+
+    # run() must hold a reference to prs, a slide can't find its package
+    # once the package is garbage collected
+    def run():
+        shapes = prs.slides[0].shapes
+        for idx in range(count):
+            shapes.add_textbox(Inches(1), Inches(1), Inches(2), Inches(0.5))
+    return run
+
+
+def bench_add_picture(params, deck_path):
+    prs = Presentation()
+    prs.slides.add_slide(prs.slidelayouts[deckgen.BLANK_LAYOUT_IDX])
+    streams = deckgen.image_streams(params.images)
+    count = params.slides
+
+    # see bench_add_textbox() on why run() gets shapes through prs
+    def run():
+        shapes = prs.slides[0].shapes
+        for idx in range(count):
+            for stream in streams:
+                shapes.add_picture(stream, Inches(1), Inches(1), Inches(2),
+                                   Inches(1.5))
+    return run
+
+
+def bench_textframe_text(params, deck_path):
+    prs = Presentation(deck_path)
+    textframes = [shape.textframe for slide in prs.slides
+                  for shape in slide.shapes if shape.has_textframe]
+
+    def run():
+        for idx, textframe in enumerate(textframes):
+            textframe.text = 'replacement text %d' % idx
+    return run
+
+
+def bench_save(params, deck_path):
+    prs = Presentation(deck_path)
+
+    def run():
+        prs.save(StringIO())
+    return run
+
+
+BENCHMARKS = (
+    ('package_open',      bench_package_open),
+    ('presentation_open', bench_presentation_open),
+    ('open_threaded',     bench_presentation_open_threaded),
+    ('add_slide',         bench_add_slide),
+    ('add_textbox',       bench_add_textbox),
+    ('add_picture',       bench_add_picture),
+    ('textframe_text',    bench_textframe_text),
+    ('save',              bench_save),
+)
+
+
+# ============================================================================
+# Runner
+# ============================================================================
+
+def run_benchmarks(params, deck_path):
+    """
+    Return dict of results keyed by benchmark name. Each benchmark is set up
+    and timed *params.repeat* times; the fastest run is the headline number
+    as it's the one least disturbed by the rest of the machine.
+    """
+    results = {}
+    for name, bench_fn in BENCHMARKS:
+        if params.only and name not in params.only:
+            continue
+        times = []
+        for idx in range(params.repeat):
+            run = bench_fn(params, deck_path)
+            start = default_timer()
+            run()
+            times.append(default_timer() - start)
+        times.sort()
+        results[name] = {
+            'best':   times[0],
+            'median': times[len(times)//2],
+            'times':  times,
+        }
+        sys.stderr.write('%-18s %9.4fs\n' % (name, times[0]))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Write a comparison of *results* against *baseline* to stderr, leaving
+    stdout to the JSON results, and return the list of names of benchmarks
+    that regressed by more than *threshold*.
+    """
+    regressions = []
+    sys.stderr.write('%-18s %10s %10s %8s\n' % ('benchmark', 'baseline',
+                                                'current', 'ratio'))
+    for name in sorted(results):
+        if name not in baseline['results']:
+            continue
+        old = baseline['results'][name]['best']
+        new = results[name]['best']
+        ratio = new / old if old else float('inf')
+        flag = ''
+        if ratio > 1.0 + threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        sys.stderr.write('%-18s %9.4fs %9.4fs %7.2fx%s\n'
+                         % (name, old, new, ratio, flag))
+    return regressions
+
+
+def parse_args(argv):
+    # optparse rather than argparse, which is new in Python 2.7
+    parser = OptionParser(description=__doc__.split('\n\n')[0])
+    parser.add_option('--slides', type='int', default=50,
+                      help='slides in the synthetic deck (N)')
+    parser.add_option('--shapes', type='int', default=10,
+                      help='text boxes per slide (M)')
+    parser.add_option('--images', type='int', default=2,
+                      help='pictures per slide (K)')
+    parser.add_option('--repeat', type='int', default=3,
+                      help='timed runs per benchmark')
+    parser.add_option('--only', action='append', metavar='NAME',
+                      help='run only the named benchmark, can be repeated')
+    parser.add_option('--out', metavar='PATH',
+                      help='write JSON results to PATH')
+    parser.add_option('--baseline', metavar='PATH',
+                      help='compare against JSON results in PATH')
+    parser.add_option('--threshold', type='float', default=0.10,
+                      help='allowed slowdown vs baseline (default 0.10)')
+    params, args = parser.parse_args(argv)
+    if args:
+        parser.error('unexpected arguments: %s' % ' '.join(args))
+    return params
+
+
+def main(argv=None):
+    params = parse_args(argv)
+    workdir = tempfile.mkdtemp()
+    try:
+        deck_path = os.path.join(workdir, 'synthetic.pptx')
+        deckgen.write_deck(deck_path, params.slides, params.shapes,
+                           params.images)
+        results = run_benchmarks(params, deck_path)
+    finally:
+        shutil.rmtree(workdir)
+
+    report = {
+        'pptx_version': pptx.__version__,
+        'python':       platform.python_version(),
+        'platform':     platform.platform(),
+        'params': {
+            'slides': params.slides,
+            'shapes': params.shapes,
+            'images': params.images,
+            'repeat': params.repeat,
+        },
+        'peak_rss_kb':  peak_rss_kb(),
+        'results':      results,
+    }
+    if params.out:
+        with open(params.out, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+
+    if params.baseline:
+        with open(params.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('params') != report['params']:
+            sys.stderr.write('warning: baseline was run with different '
+                             'parameters %s\n' % baseline.get('params'))
+        if compare(results, baseline, params.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#
+# deckgen.py
+#
+# Copyright (C) 2012, 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-pptx and is released under
+# the MIT License: http://www.opensource.org/licenses/mit-license.php
+
+"""
+Synthetic deck generator for the benchmark suite. Builds a presentation of
+*slides* slides, each carrying *shapes* text boxes and *images* pictures,
+from the default template.
+"""
+
+import os
+import sys
+
+from StringIO import StringIO
+
+try:
+    from PIL import Image as PIL_Image
+except ImportError:
+    import Image as PIL_Image
+
+thisdir = os.path.split(__file__)[0]
+sys.path.insert(0, os.path.abspath(os.path.join(thisdir, '..')))
+
+from pptx import Presentation
+from pptx.util import Inches
+
+
+BLANK_LAYOUT_IDX = 6
+
+
+def image_streams(count, size=(640, 480)):
+    """
+    Return a list of *count* distinct JPEG images, each in a file-like
+    object. Distinct colors make sure each one becomes its own image part.
+    """
+    streams = []
+    for idx in range(count):
+        color = ((idx * 37) % 256, (idx * 91) % 256, (idx * 151) % 256)
+        image = PIL_Image.new('RGB', size, color)
+        stream = StringIO()
+        image.save(stream, 'JPEG')
+        streams.append(stream)
+    return streams
+
+
+def build_deck(slides, shapes, images):
+    """
+    Return a |Presentation| with *slides* slides, each containing *shapes*
+    text boxes and *images* pictures. The same *images* images are reused
+    on every slide.
+    """
+    prs = Presentation()
+    layout = prs.slidelayouts[BLANK_LAYOUT_IDX]
+    streams = image_streams(images)
+    for sld_idx in range(slides):
+        slide = prs.slides.add_slide(layout)
+        for shp_idx in range(shapes):
+            txbox = slide.shapes.add_textbox(Inches(0.5), Inches(0.5),
+                                             Inches(2), Inches(0.5))
+            txbox.textframe.text = 'slide %d shape %d' % (sld_idx, shp_idx)
+        for stream in streams:
+            slide.shapes.add_picture(stream, Inches(1), Inches(1),
+                                     Inches(2), Inches(1.5))
+    return prs
+
+
+def write_deck(path, slides, shapes, images):
+    """Generate a synthetic deck and save it to *path*."""
+    build_deck(slides, shapes, images).save(path)
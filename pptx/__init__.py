@@ -5,16 +5,29 @@
 # the MIT License: http://www.opensource.org/licenses/mit-license.php
 
 import inspect
+import logging
 import sys
 
 import pptx.exc as exceptions
 sys.modules['pptx.exceptions'] = exceptions
 
 from pptx.api import(Presentation)
+from pptx.packaging import probe
 
 # __all__ = sorted(name for name, obj in locals().items() if not (name.startswith('_') or inspect.ismodule(obj)))
 
 __version__ = '0.2.2'
 
-del inspect, sys
 
+class _NullHandler(logging.Handler):
+    """
+    Handler that discards every record, so library logs go nowhere unless
+    the application configures logging. Stands in for
+    ``logging.NullHandler``, which is new in Python 2.7.
+    """
+    def emit(self, record):
+        pass
+
+logging.getLogger('pptx').addHandler(_NullHandler())
+
+del inspect, logging, sys
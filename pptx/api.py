@@ -23,12 +23,34 @@ class Presentation(object):
     either a path to a ``.pptx`` file (a string) or a file-like object. If
     *file* is missing or ``None``, load the built-in default presentation
     template.
+
+    |Presentation| instances can be pickled. The pickle holds the parts of the
+    presentation already extracted from the zip archive, so it makes a fast
+    warm-start snapshot for a template that is opened many times, e.g. by the
+    workers in a process pool.
     """
     def __init__(self, file=None):
         super(Presentation, self).__init__()
         self.__package = Package(file)
         self.__presentation = self.__package.presentation
 
+    def __getstate__(self):
+        return self.__package
+
+    def __setstate__(self, package):
+        self.__package = package
+        self.__presentation = package.presentation
+
+    def _copy(self):
+        """
+        Return a new |Presentation| with the same contents as this one, made
+        without parsing its XML again. Used by :func:`pptx.batch.render` to
+        give each record its own copy of the template.
+        """
+        prs = Presentation.__new__(Presentation)
+        prs.__setstate__(self.__package._copy())
+        return prs
+
     @property
     def slidelayouts(self):
         """
@@ -59,9 +81,40 @@ class Presentation(object):
         """
         return self.__presentation.slides
 
-    def save(self, file):
+    def collect_garbage(self):
+        """
+        Remove the images no longer shown by any slide, layout, or master,
+        e.g. after picture shapes are removed by editing slide XML. Return
+        the number of bytes of image data removed.
+        """
+        return self.__package.collect_garbage()
+
+    def dedupe_media(self):
+        """
+        Collapse images embedded more than once with identical contents into
+        a single image, shared by every picture showing it. Return the number
+        of bytes of image data removed.
+        """
+        return self.__package.dedupe_media()
+
+    def save(self, file, append=False, collect_garbage=False,
+             dedupe_media=False):
         """
         Save this presentation to *file*, where *file* can be either a path to
         a file (a string) or a file-like object.
+
+        If *append* is |True|, *file* must already contain a presentation,
+        usually the one this presentation was loaded from. Rather than being
+        rewritten, it is updated in place: only the items whose contents
+        changed are written, at the end of the file, so a few slides can be
+        added to a deck with hundreds of megabytes of media without copying
+        the media. The bytes of replaced items stay in the file as unused
+        space; saving without *append* writes a compact file again.
+
+        If *collect_garbage* is |True|, images no longer shown anywhere are
+        removed first, as by :meth:`collect_garbage`. If *dedupe_media* is
+        |True|, duplicate images are collapsed first, as by
+        :meth:`dedupe_media`.
         """
-        return self.__package.save(file)
+        return self.__package.save(file, append, collect_garbage,
+                                   dedupe_media)
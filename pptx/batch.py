@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+#
+# batch.py
+#
+# Copyright (C) 2012, 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-pptx and is released under
+# the MIT License: http://www.opensource.org/licenses/mit-license.php
+
+"""
+Generate many presentations from a single template, fanning the records out
+over a pool of worker processes.
+
+The template is loaded once and shipped to each worker as a pickled snapshot
+(see |Presentation|), which the worker loads once. Each record is then
+rendered into its own copy of the template, so a failure rendering one record
+can't leak into another. A copy is made by copying the XML trees of the
+loaded template rather than parsing them again.
+"""
+
+import cPickle
+import os
+import time
+import traceback
+
+from multiprocessing import Pool, cpu_count
+
+from pptx.api import Presentation
+
+
+# template, loaded once per worker process by _init_worker()
+_template = None
+
+
+class BatchResult(object):
+    """
+    Outcome of a :func:`render` call. Not intended to be constructed
+    directly.
+
+    .. attribute:: paths
+
+       List of the paths of the presentations successfully written, in the
+       order they completed.
+
+    .. attribute:: errors
+
+       List of ``(idx, record, traceback_text)`` tuples, one for each record
+       that raised while being filled or saved. *idx* is the position of the
+       record in the *records* sequence.
+
+    .. attribute:: elapsed
+
+       Wall-clock seconds for the whole batch, including pool start-up.
+    """
+    def __init__(self):
+        super(BatchResult, self).__init__()
+        self.paths = []
+        self.errors = []
+        self.elapsed = 0.0
+
+    @property
+    def count(self):
+        """Number of records processed, whether successful or not."""
+        return len(self.paths) + len(self.errors)
+
+    @property
+    def throughput(self):
+        """Records processed per second of wall-clock time."""
+        if not self.elapsed:
+            return 0.0
+        return self.count / self.elapsed
+
+
+def render(template, records, fill_fn, out_dir, workers=None,
+           filename_tmpl='%06d.pptx'):
+    """
+    Render one presentation per item in *records* and save each into
+    *out_dir*, returning a |BatchResult|.
+
+    *template* is a path or file-like object for a ``.pptx`` file, or an
+    already loaded |Presentation|. For each record, ``fill_fn(prs, record)``
+    is called with a fresh copy of the template, after which the copy is
+    saved to *out_dir* using *filename_tmpl* formatted with the record's
+    position in *records*.
+
+    *workers* is the number of worker processes and defaults to the number of
+    CPUs. If *workers* is 1, records are rendered in the calling process,
+    which can be handy for debugging. Otherwise *fill_fn* and each record
+    must be picklable, which means *fill_fn* must be defined at module level.
+    *records* can be any iterable, including a generator; records are
+    streamed to the workers rather than collected up front.
+    """
+    if not isinstance(template, Presentation):
+        template = Presentation(template)
+    snapshot = cPickle.dumps(template, cPickle.HIGHEST_PROTOCOL)
+    if workers is None:
+        workers = cpu_count()
+    path_tmpl = os.path.join(out_dir, filename_tmpl)
+    tasks = ((idx, record, fill_fn, path_tmpl % idx)
+             for idx, record in enumerate(records))
+
+    result = BatchResult()
+    start = time.time()
+    if workers == 1:
+        _init_worker(snapshot)
+        try:
+            outcomes = (_render_record(task) for task in tasks)
+            _collect(outcomes, result)
+        finally:
+            # don't keep the template alive in the calling process
+            _init_worker(None)
+    else:
+        pool = Pool(workers, _init_worker, (snapshot,))
+        try:
+            _collect(pool.imap_unordered(_render_record, tasks), result)
+            pool.close()
+        except:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+    result.elapsed = time.time() - start
+    return result
+
+
+def _collect(outcomes, result):
+    """
+    Gather the ``(idx, record, path, error)`` tuples in *outcomes* into
+    |BatchResult| *result*.
+    """
+    for idx, record, path, error in outcomes:
+        if error is None:
+            result.paths.append(path)
+        else:
+            result.errors.append((idx, record, error))
+
+
+def _init_worker(snapshot):
+    """
+    Pool initializer, loads the pickled template *snapshot* and keeps it for
+    the life of the worker. A *snapshot* of |None| releases the template.
+    """
+    global _template
+    _template = None if snapshot is None else cPickle.loads(snapshot)
+
+
+def _render_record(task):
+    """
+    Fill and save one presentation in a worker process. Any exception is
+    caught and returned as traceback text so one bad record doesn't take the
+    batch down.
+    """
+    idx, record, fill_fn, path = task
+    try:
+        prs = _template._copy()
+        fill_fn(prs, record)
+        prs.save(path)
+    except Exception:
+        return (idx, record, path, traceback.format_exc())
+    return (idx, record, path, None)
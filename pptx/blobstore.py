@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+#
+# blobstore.py
+#
+# Copyright (C) 2012, 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-pptx and is released under
+# the MIT License: http://www.opensource.org/licenses/mit-license.php
+
+"""
+Storage for the contents of binary parts such as images and video.
+
+The contents of each binary part are held in a |Blob|, which keeps its bytes
+in one of three places:
+
+* in memory,
+* in the zip archive the part was loaded from, or
+* in a temporary file, after being spilled from memory.
+
+By default every blob is held in memory, so a loaded presentation doesn't
+depend on the file it was loaded from. Setting :data:`memory_budget` turns
+on the other two. Blobs in memory are then spilled to temporary files,
+largest first, whenever their total size exceeds the budget, and saving
+writes a spilled blob to the package straight from its temporary file. A
+package loaded from a path also leaves the contents of its binary parts in
+the file, reading them each time they are needed rather than holding them
+from load until save. Together, these let a presentation holding more media
+than fits in memory be loaded, changed, and saved::
+
+    import pptx.blobstore
+    pptx.blobstore.memory_budget = 128 * 1024 * 1024  # 128 MB
+
+With a budget set, the file a presentation was loaded from must be left as
+it is until the presentation is saved, other than by saving that
+presentation over it.
+
+Media added to a presentation, such as a logo, is held in a shared blob made
+by :func:`shared`. Shared blobs are keyed by the SHA1 digest of their
+contents, so every part in the process holding the same media, in any number
+of presentations, holds the same blob.
+"""
+
+import hashlib
+import os
+import shutil
+import struct
+import tempfile
+import weakref
+import zlib
+
+from zipfile import (
+    BadZipfile, sizeFileHeader, stringFileHeader, structFileHeader,
+    ZIP_DEFLATED)
+
+
+#: Most bytes held in memory by blobs before the largest are spilled to
+#: temporary files, |None| for no limit. Setting a budget also leaves the
+#: contents of binary parts loaded from a path in the file they came from.
+memory_budget = None
+
+#: Directory for spilled blobs, |None| for the platform default.
+spill_dir = None
+
+# blobs currently holding their bytes in memory, mapped to the number of
+# bytes each holds
+_in_memory = weakref.WeakKeyDictionary()
+
+# running total of the bytes held by the blobs in _in_memory, so the budget
+# can be checked without summing them; it overstates the total while blobs
+# collected in memory are still counted, until it is next summed
+_in_memory_total = 0
+
+# shared blobs by SHA1 hex digest of their contents, while in use
+_shared = weakref.WeakValueDictionary()
+
+# bytes read at a time when copying the contents of a blob
+_CHUNK_SIZE = 64 * 1024
+
+# indexes of fields in an unpacked zip local file header
+_FH_SIGNATURE = 0
+_FH_FILENAME_LENGTH = 10
+_FH_EXTRA_FIELD_LENGTH = 11
+
+
+class Blob(object):
+    """
+    Contents of a binary part. Construct with :func:`from_bytes` or
+    :func:`from_zip_entry` rather than directly.
+    """
+    def __init__(self, size):
+        super(Blob, self).__init__()
+        self.__size = size
+        self.__bytes = None      # bytes, when held in memory
+        self.__zip_entry = None  # (path, ZipInfo), when left in a zip
+        self.__path = None       # temporary file, when spilled
+        self.__crc32 = None
+        self.__sha1 = None
+
+    def __del__(self, _remove=os.remove, _error=OSError):
+        # os module may already be torn down when called at exit
+        if self.__path is None:
+            return
+        try:
+            _remove(self.__path)
+        except _error:  # already gone, e.g. with its spill directory
+            pass
+
+    def __getstate__(self):
+        return self.read()
+
+    def __setstate__(self, bytes_):
+        self.__init__(len(bytes_))
+        self.__hold(bytes_)
+
+    @property
+    def crc32(self):
+        """CRC-32 of the contents, as stored in a zip archive."""
+        if self.__crc32 is None:
+            self.__crc32 = zlib.crc32(self.read()) & 0xFFFFFFFF
+        return self.__crc32
+
+    @property
+    def in_memory(self):
+        """|True| if the contents are held in memory."""
+        return self.__bytes is not None
+
+    @property
+    def path(self):
+        """
+        Path of the temporary file holding the contents of a spilled blob,
+        |None| if the blob is not spilled.
+        """
+        return self.__path
+
+    @property
+    def sha1(self):
+        """SHA1 hex digest of the contents, computed once."""
+        if self.__sha1 is None:
+            self.__sha1 = hashlib.sha1(self.read()).hexdigest()
+        return self.__sha1
+
+    @property
+    def size(self):
+        """Size of the contents in bytes."""
+        return self.__size
+
+    def copy_to(self, f):
+        """
+        Write the contents to file-like object *f* a chunk at a time, so the
+        contents of a blob left in a zip archive or spilled are copied
+        without all being read into memory.
+        """
+        if self.__bytes is not None:
+            f.write(self.__bytes)
+        elif self.__zip_entry is not None:
+            self.__copy_zip_entry(f)
+        else:
+            with open(self.__path, 'rb') as src:
+                shutil.copyfileobj(src, f, _CHUNK_SIZE)
+
+    def detach(self, path):
+        """
+        Copy the contents of this blob out of the zip archive at *path*, if
+        that's where they are, so the archive can be overwritten.
+        """
+        if self.__zip_entry is None:
+            return
+        if not os.path.exists(path):
+            return
+        if not _samefile(self.__zip_entry[0], path):
+            return
+        bytes_ = self.read()
+        self.__zip_entry = None
+        self.__hold(bytes_)
+
+    def read(self):
+        """Return the contents as a byte string."""
+        if self.__bytes is not None:
+            return self.__bytes
+        if self.__zip_entry is not None:
+            return self.__read_zip_entry()
+        with open(self.__path, 'rb') as f:
+            return f.read()
+
+    def spill(self):
+        """
+        Move the contents of this blob from memory to a temporary file. Does
+        nothing if they're not in memory.
+        """
+        if self.__bytes is None:
+            return
+        fd, path = tempfile.mkstemp(prefix='pptx-', dir=spill_dir)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(self.__bytes)
+        self.__path = path
+        self.__bytes = None
+        _untrack(self)
+
+    def __copy_zip_entry(self, f):
+        """
+        Write the contents of the zip entry this blob refers to to *f*,
+        decompressing them a chunk at a time.
+        """
+        path, zinfo = self.__zip_entry
+        decompressor = None
+        if zinfo.compress_type == ZIP_DEFLATED:
+            decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        crc = 0
+        with self.__open_zip_payload() as src:
+            remaining = zinfo.compress_size
+            while remaining:
+                chunk = src.read(min(remaining, _CHUNK_SIZE))
+                if not chunk:
+                    raise BadZipfile("truncated entry '%s' in '%s'"
+                                     % (zinfo.filename, path))
+                remaining -= len(chunk)
+                if decompressor is not None:
+                    chunk = decompressor.decompress(chunk)
+                crc = zlib.crc32(chunk, crc)
+                f.write(chunk)
+        if decompressor is not None:
+            chunk = decompressor.flush()
+            crc = zlib.crc32(chunk, crc)
+            f.write(chunk)
+        if crc & 0xFFFFFFFF != zinfo.CRC:
+            raise BadZipfile("bad CRC-32 for '%s' in '%s'"
+                             % (zinfo.filename, path))
+
+    def __read_zip_entry(self):
+        """
+        Return the contents of the zip entry this blob refers to. The entry
+        is read from its own header rather than through the zip directory,
+        so it can still be read while the archive is being updated in place,
+        and after the entry has been replaced by an update.
+        """
+        path, zinfo = self.__zip_entry
+        bytes_ = self.__read_zip_payload()
+        if zinfo.compress_type == ZIP_DEFLATED:
+            bytes_ = zlib.decompress(bytes_, -zlib.MAX_WBITS)
+        if zlib.crc32(bytes_) & 0xFFFFFFFF != zinfo.CRC:
+            raise BadZipfile("bad CRC-32 for '%s' in '%s'"
+                             % (zinfo.filename, path))
+        return bytes_
+
+    def __open_zip_payload(self):
+        """
+        Return the zip archive this blob refers to, open and positioned at
+        the start of the bytes of its entry as they are stored, compressed
+        if the entry is compressed.
+        """
+        path, zinfo = self.__zip_entry
+        f = open(path, 'rb')
+        try:
+            f.seek(zinfo.header_offset)
+            fheader = struct.unpack(structFileHeader, f.read(sizeFileHeader))
+            if fheader[_FH_SIGNATURE] != stringFileHeader:
+                raise BadZipfile("bad zip entry header for '%s' in '%s'"
+                                 % (zinfo.filename, path))
+            f.seek(fheader[_FH_FILENAME_LENGTH] +
+                   fheader[_FH_EXTRA_FIELD_LENGTH], os.SEEK_CUR)
+        except:
+            f.close()
+            raise
+        return f
+
+    def __read_zip_payload(self):
+        """
+        Return the bytes of the zip entry this blob refers to as they are
+        stored in the archive, compressed if the entry is compressed.
+        """
+        with self.__open_zip_payload() as f:
+            return f.read(self.__zip_entry[1].compress_size)
+
+    def __hold(self, bytes_):
+        """Keep *bytes_* in memory as the contents of this blob."""
+        self.__bytes = bytes_
+        _track(self, self.__size)
+
+    @classmethod
+    def _from_bytes(cls, bytes_):
+        blob = cls(len(bytes_))
+        blob.__hold(bytes_)
+        return blob
+
+    @classmethod
+    def _shared(cls, bytes_):
+        sha1 = hashlib.sha1(bytes_).hexdigest()
+        blob = _shared.get(sha1)
+        if blob is None:
+            blob = cls._from_bytes(bytes_)
+            blob.__sha1 = sha1
+            _shared[sha1] = blob
+        return blob
+
+    @classmethod
+    def _from_zip_entry(cls, path, zinfo):
+        blob = cls(zinfo.file_size)
+        blob.__zip_entry = (os.path.abspath(path), zinfo)
+        blob.__crc32 = zinfo.CRC
+        return blob
+
+
+def from_bytes(bytes_):
+    """Return a |Blob| holding *bytes_* in memory, within the budget."""
+    return Blob._from_bytes(bytes_)
+
+
+def shared(bytes_):
+    """
+    Return the shared |Blob| whose contents are *bytes_*, the one already
+    held by a part anywhere in the process if there is one.
+    """
+    return Blob._shared(bytes_)
+
+
+def from_zip_entry(path, zinfo):
+    """
+    Return a |Blob| whose contents are the entry described by *zinfo* in the
+    zip archive at *path*, read from the archive each time they're needed.
+    """
+    return Blob._from_zip_entry(path, zinfo)
+
+
+def _enforce_budget():
+    """
+    Spill blobs held in memory, largest first, until their total size is
+    within :data:`memory_budget`.
+    """
+    global _in_memory_total
+    if memory_budget is None or _in_memory_total <= memory_budget:
+        return
+    sizes = sorted(_in_memory.items(), key=lambda item: item[1],
+                   reverse=True)
+    _in_memory_total = sum(size for blob, size in sizes)
+    for blob, size in sizes:
+        if _in_memory_total <= memory_budget:
+            break
+        blob.spill()
+
+
+def _track(blob, size):
+    """
+    Count *blob* as holding *size* bytes in memory, spilling blobs if that
+    takes the total over budget.
+    """
+    global _in_memory_total
+    _in_memory_total += size - _in_memory.get(blob, 0)
+    _in_memory[blob] = size
+    _enforce_budget()
+
+
+def _untrack(blob):
+    """Stop counting *blob* as holding bytes in memory."""
+    global _in_memory_total
+    _in_memory_total -= _in_memory.pop(blob, 0)
+
+
+def _samefile(path1, path2):
+    """
+    Return |True| if *path1* and *path2* name the same file. Falls back to
+    comparing normalized paths where :func:`os.path.samefile` isn't
+    available, as on Windows under Python 2.
+    """
+    if hasattr(os.path, 'samefile'):
+        return os.path.samefile(path1, path2)
+    def normalized(path):
+        return os.path.normcase(os.path.abspath(path))
+    return normalized(path1) == normalized(path2)
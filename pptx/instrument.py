@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+#
+# instrument.py
+#
+# Copyright (C) 2012, 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-pptx and is released under
+# the MIT License: http://www.opensource.org/licenses/mit-license.php
+
+"""
+Opt-in timing instrumentation for the load and save paths.
+
+Code in :mod:`pptx.packaging` and :mod:`pptx.presentation` wraps each phase
+of its work in :func:`phase`. When no listener is registered, :func:`phase`
+returns a shared do-nothing context manager, so the cost of the
+instrumentation is a function call and a truth test. When one or more
+listeners are registered, each phase is timed and passed to every listener
+as an event, a :class:`dict` like::
+
+    {'name': 'xml_parse', 'seconds': 0.0012,
+     'partname': '/ppt/slides/slide1.xml', 'bytes': 5678}
+
+Every event has ``'name'`` and ``'seconds'`` keys; other keys depend on the
+phase. The phases are:
+
+=====================  =====================================================
+``pkg_open``           whole package-side open (``parts``)
+``content_types_load`` read and parse ``[Content_Types].xml``
+``read``               read one item from the zip or directory (``itemURI``,
+                       ``bytes``)
+``rels_parse``         read and parse a ``.rels`` item (``itemURI``)
+``xml_parse``          parse one XML part into the object model
+                       (``partname``, ``bytes``)
+``load``               whole presentation load, including the above
+``collect_garbage``    remove unreferenced images (``parts``, ``bytes``
+                       removed)
+``dedupe_media``       collapse duplicate images (``parts``, ``bytes``
+                       removed)
+``marshal``            marshal the object model into package parts (``parts``)
+``serialize``          serialize one XML part (``partname``, ``bytes``)
+``write``              compress and write one item to the zip archive
+                       (``itemURI``, ``bytes``, ``compressed_bytes``)
+``pkg_save``           whole package-side save (``parts``)
+=====================  =====================================================
+
+``xml_parse`` events for a large package are sent from the threads of the
+pool that parses its parts, so a listener must be safe to call from more
+than one thread.
+
+A listener is any callable taking the event. :class:`Recorder` is a
+listener that collects events while in a ``with`` block::
+
+    with Recorder() as recorder:
+        prs = Presentation('big-template.pptx')
+    print recorder.totals()
+
+:class:`LogTrace` is a listener that writes each event as a log record on the
+``pptx.trace`` logger, for load and save diagnostics in a running service::
+
+    logging.getLogger('pptx.trace').setLevel(logging.DEBUG)
+    add_listener(LogTrace())
+"""
+
+import logging
+
+from timeit import default_timer
+
+
+log = logging.getLogger('pptx.instrument')
+
+_listeners = []
+
+
+def add_listener(listener):
+    """
+    Begin passing instrumentation events to *listener*, a callable taking
+    the event :class:`dict` as its only argument.
+    """
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def remove_listener(listener):
+    """Stop passing instrumentation events to *listener*."""
+    _listeners.remove(listener)
+
+
+def phase(name, **fields):
+    """
+    Return a context manager that times the code in its ``with`` block and
+    sends the result to each listener as an event named *name*. Keyword
+    arguments are added to the event. A field that is only known once the
+    phase is underway can be added by calling ``set(**fields)`` on the
+    context manager inside the block.
+    """
+    if not _listeners:
+        return _NULL_PHASE
+    return _Phase(name, fields)
+
+
+class Recorder(object):
+    """
+    Listener that collects events in :attr:`events`. Registers itself on
+    entering a ``with`` block and unregisters on leaving it.
+    """
+    def __init__(self):
+        super(Recorder, self).__init__()
+        self.events = []
+
+    def __call__(self, event):
+        self.events.append(event)
+
+    def __enter__(self):
+        add_listener(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        remove_listener(self)
+
+    def totals(self):
+        """
+        Return a dict keyed by phase name of dicts summarizing the recorded
+        events having that name, e.g.
+        ``{'xml_parse': {'count': 61, 'seconds': 0.21, 'bytes': 1043110}}``.
+        """
+        totals = {}
+        for event in self.events:
+            total = totals.setdefault(event['name'], {'count': 0,
+                                                      'seconds': 0.0,
+                                                      'bytes': 0})
+            total['count'] += 1
+            total['seconds'] += event['seconds']
+            total['bytes'] += event.get('bytes', 0)
+        return totals
+
+
+class LogTrace(object):
+    """
+    Listener that logs each event on *logger* (default ``pptx.trace``) at
+    *level* (default ``DEBUG``). The message is one line of the form
+    ``xml_parse 0.001200s bytes=5678 partname=/ppt/slides/slide1.xml``; the
+    event dict itself is attached to the log record as ``pptx_event`` for
+    handlers that emit structured records. Can be used as a context manager
+    in the same way as |Recorder|.
+    """
+    def __init__(self, logger='pptx.trace', level=logging.DEBUG):
+        super(LogTrace, self).__init__()
+        self.__log = logging.getLogger(logger)
+        self.__level = level
+
+    def __call__(self, event):
+        if not self.__log.isEnabledFor(self.__level):
+            return
+        fields = ' '.join('%s=%s' % (key, event[key]) for key in
+                          sorted(event) if key not in ('name', 'seconds'))
+        self.__log.log(self.__level, '%s %.6fs %s', event['name'],
+                       event['seconds'], fields,
+                       extra={'pptx_event': event})
+
+    def __enter__(self):
+        add_listener(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        remove_listener(self)
+
+
+class _Phase(object):
+    """
+    Context manager that times its ``with`` block and notifies listeners.
+    """
+    def __init__(self, name, fields):
+        super(_Phase, self).__init__()
+        self.__name = name
+        self.__fields = fields
+
+    def __enter__(self):
+        self.__start = default_timer()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        event = dict(self.__fields)
+        event['name'] = self.__name
+        event['seconds'] = default_timer() - self.__start
+        for listener in list(_listeners):
+            if exc_type is None:
+                listener(event)
+                continue
+            # a listener error must not replace the exception propagating
+            # out of the phase
+            try:
+                listener(event)
+            except Exception:
+                log.exception("instrumentation listener %r raised",
+                              listener)
+
+    def set(self, **fields):
+        """Add *fields* to the event this phase will send."""
+        self.__fields.update(fields)
+
+
+class _NullPhase(object):
+    """
+    Stand-in for |_Phase| when instrumentation is off. Stateless, so a single
+    instance is shared.
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def set(self, **fields):
+        pass
+
+_NULL_PHASE = _NullPhase()
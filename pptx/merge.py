@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+#
+# merge.py
+#
+# Copyright (C) 2012, 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-pptx and is released under
+# the MIT License: http://www.opensource.org/licenses/mit-license.php
+
+"""
+Mail merge of ``{{token}}`` placeholders in the text of a presentation.
+
+A |MergeTemplate| scans the slides of a presentation once, when it is
+constructed, and keeps a reference to each text element containing a token
+along with that element's original text. Each call to :meth:`apply` then
+rewrites just those elements from their original text, so the same loaded
+presentation can be filled and saved once per record without searching its
+XML again::
+
+    prs = Presentation('letter-template.pptx')
+    template = MergeTemplate(prs)
+    for idx, record in enumerate(records):
+        template.apply(record)
+        prs.save('letter-%04d.pptx' % idx)
+
+PowerPoint often splits what looks like one word across several runs, for
+example when part of it was spell-checked or edited later. A token split that
+way is gathered into the first of its runs when the template is compiled,
+taking on that run's character formatting.
+"""
+
+import re
+
+from pptx.oxml import qn
+from pptx.presentation import _to_unicode
+from pptx.spec import namespaces
+
+
+_nsmap = namespaces('a')
+
+# token names are word characters, dots, and hyphens, e.g. {{ first_name }}
+_token_re = re.compile(r'\{\{\s*([\w.-]+)\s*\}\}', re.UNICODE)
+
+_R = qn('a:r')
+_T = qn('a:t')
+
+
+class MergeTemplate(object):
+    """
+    Compiled map of the ``{{token}}`` placeholders in the text of the slides
+    of *prs*, a |Presentation|. Compiling merges runs as needed so that each
+    token is contained in a single run.
+    """
+    def __init__(self, prs):
+        super(MergeTemplate, self).__init__()
+        self.__targets = []  # (a:t element, original text, token names)
+        for slide in prs.slides:
+            for p in slide._element.xpath('.//a:p', namespaces=_nsmap):
+                self.__compile_paragraph(p)
+        self.__tokens = frozenset(name for t, text, names in self.__targets
+                                  for name in names)
+
+    @property
+    def tokens(self):
+        """
+        Frozenset of the names of the tokens in the template, e.g.
+        ``frozenset(['first_name', 'city'])``.
+        """
+        return self.__tokens
+
+    def apply(self, record):
+        """
+        Replace each token in the presentation with its value in *record*, a
+        mapping of token name to value. Values that are not strings are
+        converted with :func:`unicode`; strings are treated as in
+        :attr:`Run.text`. Items in *record* not matching a token are ignored.
+        Raises :exc:`KeyError` if a token has no value in *record*, in which
+        case the presentation is left unchanged.
+        """
+        missing = [name for name in self.__tokens if name not in record]
+        if missing:
+            raise KeyError(sorted(missing)[0])
+        values = dict((name, self.__text(record[name]))
+                      for name in self.__tokens)
+
+        def value_of(match):
+            return values[match.group(1)]
+
+        for t, text, names in self.__targets:
+            t._setText(_token_re.sub(value_of, text))
+
+    def __compile_paragraph(self, p):
+        """
+        Gather any token split across runs of paragraph *p* into one run and
+        add each text element in *p* containing a token to the targets. Only
+        contiguous runs are joined; a line break, field, or other element
+        between runs separates them.
+        """
+        for t_elms in self.__run_groups(p):
+            while self.__join_split_token(t_elms):
+                pass
+            for t in t_elms:
+                text = t.text or u''
+                names = tuple(m.group(1) for m in _token_re.finditer(text))
+                if names:
+                    self.__targets.append((t, text, names))
+
+    @staticmethod
+    def __run_groups(p):
+        """
+        Return list of lists of the ``<a:t>`` elements of each sequence of
+        contiguous runs in paragraph *p*.
+        """
+        groups, group = [], []
+        for child in p.iterchildren():
+            if child.tag != _R:
+                if group:
+                    groups.append(group)
+                group = []
+                continue
+            t = child.find(_T)
+            if t is not None:
+                group.append(t)
+        if group:
+            groups.append(group)
+        return groups
+
+    @staticmethod
+    def __join_split_token(t_elms):
+        """
+        Move the text of the first token found spanning more than one of
+        *t_elms* into the first element it starts in, removing any run left
+        empty by doing so. Return |True| if a token was joined, |False| if
+        there was no split token to join.
+        """
+        texts = [t.text or u'' for t in t_elms]
+        # starts[i] is offset in joined paragraph text where texts[i] begins
+        starts, offset = [], 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text)
+
+        def elm_idx_at(offset):
+            idx = 0
+            while idx+1 < len(starts) and starts[idx+1] <= offset:
+                idx += 1
+            return idx
+
+        for match in _token_re.finditer(u''.join(texts)):
+            first = elm_idx_at(match.start())
+            last = elm_idx_at(match.end()-1)
+            if first == last:
+                continue
+            cut = match.end() - starts[last]
+            joined = texts[first] + u''.join(texts[first+1:last]) \
+                + texts[last][:cut]
+            t_elms[first]._setText(joined)
+            t_elms[last]._setText(texts[last][cut:])
+            # runs wholly inside the token, and the last run if the token
+            # used up all its text, are no longer needed
+            drop = t_elms[first+1:last]
+            if not texts[last][cut:]:
+                drop.append(t_elms[last])
+            for t in drop:
+                r = t.getparent()
+                r.getparent().remove(r)
+                t_elms.remove(t)
+            return True
+        return False
+
+    @staticmethod
+    def __text(value):
+        """Return *value* as unicode text for the merge."""
+        if not isinstance(value, basestring):
+            value = unicode(value)
+        return _to_unicode(value)
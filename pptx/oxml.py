@@ -14,6 +14,10 @@ bit of the lxml graph that spans the entire Open XML package part, e.g. a
 slide.
 """
 
+import threading
+
+from copy import deepcopy
+
 from lxml import etree, objectify
 
 nsmap =\
@@ -25,7 +29,14 @@ nsmap =\
 etree.register_namespace('a', nsmap['a'])
 etree.register_namespace('p', nsmap['p'])
 
-oxml_parser = objectify.makeparser(remove_blank_text=True)
+#: Set to |True| to lift the limits libxml2 puts on tree depth and text node
+#: size, for the odd slide too big to parse within them. Off by default, as
+#: the limits guard against documents crafted to exhaust memory.
+huge_tree = False
+
+# an lxml parser allows only one thread at a time to parse with it, so each
+# thread keeps a pool of parsers of its own
+_thread_parsers = threading.local()
 
 # ============================================================================
 # API functions
@@ -39,11 +50,11 @@ def _SubElement(parent, tag, nsmap=None):
 
 def oxml_fromstring(text):
     """``etree.fromstring()`` replacement that uses oxml parser"""
-    return objectify.fromstring(text, oxml_parser)
+    return objectify.fromstring(text, _oxml_parser())
 
 def oxml_parse(source):
     """``etree.parse()`` replacement that uses oxml parser"""
-    return objectify.parse(source, oxml_parser)
+    return objectify.parse(source, _oxml_parser())
 
 def oxml_tostring(elm, encoding=None, pretty_print=False, standalone=None):
     # if xsi parameter is not set to False, PowerPoint won't load without a
@@ -53,6 +64,14 @@ def oxml_tostring(elm, encoding=None, pretty_print=False, standalone=None):
     return etree.tostring(elm, encoding=encoding, pretty_print=pretty_print,
                           standalone=standalone)
 
+def _nsdecls(*prefixes):
+    """
+    Return namespace declarations for *prefixes*, in the order given, for use
+    in an XML literal, e.g. ``_nsdecls('p', 'a')`` returns
+    ``'xmlns:p="http://..." xmlns:a="http://..."'``.
+    """
+    return ' '.join('xmlns:%s="%s"' % (pfx, nsmap[pfx]) for pfx in prefixes)
+
 def qn(tag):
     """
     Stands for "qualified name", a utility function to turn a namespace
@@ -68,6 +87,51 @@ def qn(tag):
 # utility functions
 # ============================================================================
 
+def _oxml_parser():
+    """
+    Return the calling thread's objectify parser, used to parse the XML
+    parts of a presentation into the object model.
+    """
+    return _pooled_parser(objectify.makeparser)
+
+def _xml_parser():
+    """
+    Return the calling thread's plain lxml parser, used to parse package
+    items such as ``.rels`` items and ``[Content_Types].xml``.
+    """
+    return _pooled_parser(etree.XMLParser)
+
+def _parser_options():
+    """
+    Return dict of the lxml parser options shared by all parsers, for use
+    as keyword arguments to a parser or to ``etree.iterparse()``.
+    """
+    # ID attributes are never looked up by value, so there's no point in
+    # libxml2 building a table of them
+    return {'collect_ids': False, 'huge_tree': huge_tree}
+
+def _pooled_parser(factory):
+    """
+    Return the calling thread's parser made by *factory*, creating it on
+    first use or after :data:`huge_tree` changes. Reusing a parser saves
+    creating one per item parsed, and a parser per thread means threads
+    parsing at the same time don't wait on each other.
+    """
+    pool = getattr(_thread_parsers, 'pool', None)
+    if pool is None:
+        pool = _thread_parsers.pool = {}
+    key = (factory, huge_tree)
+    parser = pool.get(key)
+    if parser is None:
+        parser = pool[key] = factory(remove_blank_text=True,
+                                     **_parser_options())
+    return parser
+
+#: Objectify parser of the thread that imported this module, under its old
+#: name for code that passes it to lxml itself. Other threads parse with a
+#: parser of their own, see :func:`oxml_fromstring`.
+oxml_parser = _oxml_parser()
+
 def _child(element, child_tagname):
     """
     Return direct child of *element* having *child_tagname* or :class:`None`
@@ -101,6 +165,54 @@ def _get_or_add(start_elm, *path_tags):
     return child
 
 
+# ============================================================================
+# Element templates
+# ============================================================================
+
+class _ElementTemplate(object):
+    """
+    Skeleton element parsed once from *xml* and deep-copied each time a new
+    element is needed. Faster than building the element child by child when
+    many are created, e.g. shapes. Each keyword argument names the first
+    descendant having the given tag, e.g. ``off='a:off'``. Those descendants
+    are located in each copy by child index rather than objectify attribute
+    lookup, ready to have their attributes set.
+    """
+    def __init__(self, xml, **targets):
+        super(_ElementTemplate, self).__init__()
+        self.__element = oxml_fromstring(xml)
+        self.__paths = tuple((name, self.__path_to(tag))
+                             for name, tag in targets.items())
+
+    def new(self):
+        """
+        Return a 2-tuple ``(element, targets)`` where *element* is a new copy
+        of the skeleton and *targets* is a dict of the named descendants of
+        that copy.
+        """
+        element = deepcopy(self.__element)
+        targets = {}
+        for name, path in self.__paths:
+            target = element
+            for idx in path:
+                target = target.getchildren()[idx]
+            targets[name] = target
+        return element, targets
+
+    def __path_to(self, tag):
+        """
+        Return tuple of child indices leading from the skeleton root to its
+        first descendant having *tag*.
+        """
+        target = next(self.__element.iterdescendants(qn(tag)))
+        path = []
+        parent = target.getparent()
+        while parent is not None:
+            path.insert(0, parent.index(target))
+            target, parent = parent, parent.getparent()
+        return tuple(path)
+
+
 # ============================================================================
 # Custom element classes
 # ============================================================================
@@ -15,39 +15,52 @@ to and from the package, zip file manipulation, and traversing relationship
 items.
 
 The main API class is :class:`pptx.packaging.Package` which provides the
-methods :meth:`open`, :meth:`marshal`, and :meth:`save`.
+methods :meth:`open`, :meth:`marshal`, and :meth:`save`. :func:`probe` and
+:func:`iter_text` read metadata and text of a presentation straight from the
+package, without loading it.
 '''
 
 import os
 import posixpath
 import re
+import tempfile
 
 from StringIO import StringIO
 from lxml import etree
+from xml.sax.saxutils import escape
 from zipfile import ZipFile, is_zipfile, ZIP_DEFLATED
+from zlib import crc32
 
+import pptx.blobstore as blobstore
 import pptx.spec
 
 from pptx.exceptions import (
-    CorruptedPackageError, DuplicateKeyError, NotXMLError,
-    PackageNotFoundError)
+    CorruptedPackageError, DuplicateKeyError, InvalidPackageError,
+    NotXMLError, PackageNotFoundError)
 
+from pptx.instrument import phase
+from pptx.oxml import _parser_options, _xml_parser
 from pptx.spec import qtag
 from pptx.spec import PTS_HASRELS_NEVER, PTS_HASRELS_OPTIONAL
+from pptx.spec import CT_PRESENTATION, CT_SLIDESHOW, CT_TEMPLATE
+from pptx.spec import RT_COREPROPS, RT_OFFICEDOCUMENT
 
 import logging
 log = logging.getLogger('pptx.packaging')
-log.setLevel(logging.DEBUG)
-# log.setLevel(logging.INFO)
-ch = logging.StreamHandler()
-ch.setLevel(logging.DEBUG)
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s'
-                              ' - %(message)s')
-ch.setFormatter(formatter)
-log.addHandler(ch)
 
 PKG_BASE_URI = '/'
 
+# relative paths cached by Relationship before the cache is cleared
+_RELPATH_CACHE_SIZE = 4096
+
+# start of each XML item written from bytes rather than an element tree,
+# matching the declaration lxml writes
+_XML_DECLARATION = "<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+
+# escapes needed in a double-quoted attribute value beyond &, <, and >
+_XML_ATTR_ENTITIES = {'"': '&quot;', '\n': '&#10;', '\r': '&#13;',
+                      '\t': '&#9;'}
+
 
 # ============================================================================
 # API Classes
@@ -93,22 +106,26 @@ class Package(object):
         path to a directory, the directory must contain an expanded package
         such as is produced by unzipping an OPC package file.
         """
-        fs = FileSystem(file)
-        cti = _ContentTypesItem().load(fs)
-        self.__relationships = []  # discard any rels from prior load
-        parts_dict = {}            # track loaded parts, graph is cyclic
-        pkg_rel_elms = fs.getelement(Package.PKG_RELSITEM_URI)\
-                         .findall(qtag('pr:Relationship'))
-        for rel_elm in pkg_rel_elms:
-            rId = rel_elm.get('Id')
-            reltype = rel_elm.get('Type')
-            partname = '/%s' % rel_elm.get('Target')
-            part = Part()
-            parts_dict[partname] = part
-            part._load(fs, partname, cti, parts_dict)
-            rel = Relationship(rId, self, reltype, part)
-            self.__relationships.append(rel)
-        fs.close()
+        with phase('pkg_open') as ph:
+            fs = FileSystem(file)
+            with phase('content_types_load'):
+                cti = _ContentTypesItem().load(fs)
+            self.__relationships = []  # discard any rels from prior load
+            parts_dict = {}            # track loaded parts, graph is cyclic
+            with phase('rels_parse', itemURI=Package.PKG_RELSITEM_URI):
+                pkg_rel_elms = fs.getelement(Package.PKG_RELSITEM_URI)\
+                                 .findall(qtag('pr:Relationship'))
+            for rel_elm in pkg_rel_elms:
+                rId = rel_elm.get('Id')
+                reltype = rel_elm.get('Type')
+                partname = '/%s' % rel_elm.get('Target')
+                part = Part()
+                parts_dict[partname] = part
+                part._load(fs, partname, cti, parts_dict)
+                rel = Relationship(rId, self, reltype, part)
+                self.__relationships.append(rel)
+            fs.close()
+            ph.set(parts=len(parts_dict))
         return self
 
     def marshal(self, model_pkg):
@@ -132,33 +149,37 @@ class Package(object):
             self.__relationships.append(marshaled_rel)
         return self
 
-    def save(self, file):
+    def save(self, file, append=False):
         """
         Save this package to *file*, where *file* can be either a path to a
-        file (a string) or a file-like object.
-        """
-        # open a zip filesystem for writing package
-        zipfs = ZipFileSystem(file, 'w')
-        # write [Content_Types].xml
-        cti = _ContentTypesItem().compose(self.parts)
-        zipfs.write_element(cti.element, '/[Content_Types].xml')
-        # write pkg rels item
-        zipfs.write_element(self.__relsitem_element, self.PKG_RELSITEM_URI)
-        for part in self.parts:
-            # write part item
-            zipfs.write_blob(part.blob, part.partname)
-            # write rels item if part has one
-            if part.relationships:
-                zipfs.write_element(part._relsitem_element, part._relsitemURI)
-        zipfs.close()
-
-    @property
-    def __relsitem_element(self):
-        nsmap = {None: pptx.spec.nsmap['pr']}
-        element = etree.Element(qtag('pr:Relationships'), nsmap=nsmap)
-        for rel in self.__relationships:
-            element.append(rel._element)
-        return element
+        file (a string) or a file-like object. If *append* is |True|, *file*
+        must hold an existing package, which is updated in place as
+        described in :class:`ZipFileSystem`.
+        """
+        parts = self.parts
+        with phase('pkg_save', parts=len(parts)):
+            # rewriting the file binary parts were loaded from would lose
+            # any contents still left in it
+            if isinstance(file, basestring) and not append:
+                for part in parts:
+                    if part._blobref is not None:
+                        part._blobref.detach(file)
+            # open a zip filesystem for writing package
+            zipfs = ZipFileSystem(file, 'a' if append else 'w')
+            # write [Content_Types].xml
+            cti = _ContentTypesItem().compose(parts)
+            zipfs.write_blob(cti.xml, '/[Content_Types].xml')
+            # write pkg rels item
+            zipfs.write_blob(_relsitem_xml(self.__relationships),
+                             self.PKG_RELSITEM_URI)
+            for part in parts:
+                # write part item
+                zipfs.write_blob(part._blobref or part.blob, part.partname)
+                # write rels item if part has one
+                if part.relationships:
+                    zipfs.write_blob(_relsitem_xml(part.relationships),
+                                     part._relsitemURI)
+            zipfs.close()
 
     @classmethod
     def __walkparts(cls, rels, parts=None):
@@ -213,6 +234,17 @@ class Part(object):
         self.typespec = None
         self.blob = None
 
+    @property
+    def blob(self):
+        if self._blobref is not None:
+            return self._blobref.read()
+        return self.__blob
+
+    @blob.setter
+    def blob(self, blob):
+        self.__blob = blob
+        self._blobref = None
+
     @property
     def content_type(self):
         """Content type of this part"""
@@ -240,7 +272,8 @@ class Part(object):
         Load part identified as *partname* from filesystem *fs* and propagate
         the load to related parts.
         """
-        # log.debug("loading %s", partname)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("loading %s", partname)
 
         # calculate working values
         baseURI = os.path.split(partname)[0]
@@ -248,7 +281,13 @@ class Part(object):
 
         # set persisted attributes
         self.__partname = partname
-        self.blob = fs.getblob(partname)
+        with phase('read', itemURI=partname) as ph:
+            if partname.endswith('.xml'):
+                self.blob = fs.getblob(partname)
+            else:
+                self._blobref = fs.getblobref(partname)
+            ph.set(bytes=len(self.blob) if self._blobref is None
+                   else self._blobref.size)
         self.typespec = PartTypeSpec(content_type)
 
         # load relationships and propagate load to target parts
@@ -278,13 +317,17 @@ class Part(object):
         Load the contents of model-side part such that it can be saved to
         disk. Propagate marshalling to related parts.
         """
-        # log.debug("marshalling %s", model_part.partname)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("marshalling %s", model_part.partname)
 
         # unpack working values
         content_type = model_part._content_type
         # assign persisted attributes from model part
         self.__partname = model_part.partname
-        self.blob = model_part._blob
+        if model_part._blobref is None:
+            self.blob = model_part._blob
+        else:
+            self._blobref = model_part._blobref
         self.typespec = PartTypeSpec(content_type)
 
         # load relationships and propagate marshal to target parts
@@ -305,14 +348,6 @@ class Part(object):
             marshalled_rel = Relationship(rId, self, reltype, part)
             self.__relationships.append(marshalled_rel)
 
-    @property
-    def _relsitem_element(self):
-        nsmap = {None: pptx.spec.nsmap['pr']}
-        element = etree.Element(qtag('pr:Relationships'), nsmap=nsmap)
-        for rel in self.__relationships:
-            element.append(rel._element)
-        return element
-
     @property
     def _relsitemURI(self):
         """
@@ -336,7 +371,8 @@ class Part(object):
         if relsitemURI not in fs:
             tmpl = "required relationships item '%s' not found in package"
             raise CorruptedPackageError(tmpl % relsitemURI)
-        root_elm = fs.getelement(relsitemURI)
+        with phase('rels_parse', itemURI=relsitemURI):
+            root_elm = fs.getelement(relsitemURI)
         return root_elm.findall(qtag('pr:Relationship'))
 
     @staticmethod
@@ -385,6 +421,10 @@ class Relationship(object):
        The target :class:`pptx.packaging.Part` instance in this relationship.
 
     """
+    # cache of relative target paths, keyed by (baseURI, partname); the same
+    # few hundred pairs come up on every save of a deck
+    __relpaths = {}
+
     def __init__(self, rId, source, reltype, target):
         super(Relationship, self).__init__()
         self.__source = source
@@ -393,16 +433,14 @@ class Relationship(object):
         self.target = target
 
     @property
-    def _element(self):
+    def _xml(self):
         """
-        The :class:`ElementTree._Element` instance containing the XML
-        representation of this Relationship.
+        The ``<Relationship>`` element representing this relationship in a
+        ``.rels`` item, as an indented line of UTF-8 encoded XML.
         """
-        element = etree.Element('Relationship')
-        element.set('Id', self.rId)
-        element.set('Type', self.reltype)
-        element.set('Target', self.__target_relpath)
-        return element
+        return '  <Relationship Id=%s Type=%s Target=%s/>\n' % (
+            _xml_attr(self.rId), _xml_attr(self.reltype),
+            _xml_attr(self.__target_relpath))
 
     @property
     def __baseURI(self):
@@ -413,12 +451,20 @@ class Relationship(object):
 
     @property
     def __target_relpath(self):
+        baseURI, partname = self.__baseURI, self.target.partname
+        key = (baseURI, partname)
+        relpath = Relationship.__relpaths.get(key)
+        if relpath is not None:
+            return relpath
         # workaround for posixpath bug in 2.6, doesn't generate correct
         # relative path when *start* (second) parameter is root ('/')
-        if self.__baseURI == '/':
-            relpath = self.target.partname[1:]
+        if baseURI == '/':
+            relpath = partname[1:]
         else:
-            relpath = posixpath.relpath(self.target.partname, self.__baseURI)
+            relpath = posixpath.relpath(partname, baseURI)
+        if len(Relationship.__relpaths) >= _RELPATH_CACHE_SIZE:
+            Relationship.__relpaths.clear()
+        Relationship.__relpaths[key] = relpath
         return relpath
 
 
@@ -520,6 +566,13 @@ class PartTypeSpec(object):
         # return the instance; note that __init__() gets called either way
         return cls.__instances[content_type]
 
+    def __reduce__(self):
+        """
+        Pickle by content type so an unpickled spec resolves to the cached
+        instance rather than a duplicate.
+        """
+        return (PartTypeSpec, (self.content_type,))
+
     def __init__(self, content_type):
         """Initialize spec attributes from constant values in pptx.spec."""
         # skip loading if this instance is from the cache
@@ -639,6 +692,26 @@ class _ContentTypesItem(object):
                 subelm.set('ContentType', self.__overrides[partname])
         return element
 
+    @property
+    def xml(self):
+        """
+        The ``[Content_Types].xml`` item as UTF-8 encoded bytes, the same as
+        :attr:`element` written with :meth:`ZipFileSystem.write_element`,
+        but produced without building an element tree.
+        """
+        lines = ['<Types xmlns="%s">\n' % pptx.spec.nsmap['ct']]
+        for ext in sorted(self.__defaults or ()):
+            lines.append('  <Default Extension=%s ContentType=%s/>\n' % (
+                _xml_attr(ext), _xml_attr(self.__defaults[ext])))
+        for partname in sorted(self.__overrides or ()):
+            lines.append('  <Override PartName=%s ContentType=%s/>\n' % (
+                _xml_attr(partname), _xml_attr(self.__overrides[partname])))
+        if len(lines) == 1:
+            lines = ['<Types xmlns="%s"/>\n' % pptx.spec.nsmap['ct']]
+        else:
+            lines.append('</Types>\n')
+        return _XML_DECLARATION + ''.join(lines)
+
     def load(self, fs):
         """
         Retrieve [Content_Types].xml from specified file system and load it.
@@ -710,6 +783,13 @@ class BaseFileSystem(object):
         stream.close()
         return blob
 
+    def getblobref(self, itemURI):
+        """
+        Return |Blob| containing the item identified by *itemURI*, for a
+        binary item.
+        """
+        return blobstore.from_bytes(self.getblob(itemURI))
+
     def getelement(self, itemURI):
         """
         Return ElementTree element of XML item identified by *itemURI*.
@@ -718,8 +798,7 @@ class BaseFileSystem(object):
             raise LookupError("No package item with URI '%s'" % itemURI)
         stream = self.getstream(itemURI)
         try:
-            parser = etree.XMLParser(remove_blank_text=True)
-            element = etree.parse(stream, parser).getroot()
+            element = etree.parse(stream, _xml_parser()).getroot()
         except etree.XMLSyntaxError:
             raise NotXMLError("package item %s is not XML" % itemURI)
         stream.close()
@@ -788,22 +867,82 @@ class ZipFileSystem(BaseFileSystem):
     If *file* is a path and a file with that name already exists, it is
     truncated.
 
+    If mode is 'a', the package already in *file* is updated in place. An
+    item written with the same bytes as the existing item of that name is
+    skipped. Any other item is appended after the existing ones, and the
+    existing item it replaces is dropped from the zip directory. Items not
+    written before :meth:`close` are dropped too. The bytes of a dropped item
+    are left in the file, unreferenced, until it is next written in mode
+    'w'. Updating a large, media-heavy package this way leaves its media
+    where it is rather than copying it.
+
+    ZIP64 extensions are used when writing as needed, so a package can be
+    larger than 2 GB or contain more than 65,535 items.
+
     Inherits :meth:`__contains__`, :meth:`getelement`, and :attr:`path` from
     BaseFileSystem.
     """
     def __init__(self, file, mode='r'):
         super(ZipFileSystem, self).__init__()
-        if 'w' in mode:
-            self.zipf = ZipFile(file, 'w', compression=ZIP_DEFLATED)
+        self.__mode = mode
+        self.__path = file if isinstance(file, basestring) else None
+        self.__written = set()  # URIs of items written since opened
+        self.__appendf = None   # file being updated in mode 'a'
+        self.__appended = False  # whether an item was appended in mode 'a'
+        self.__dropped = False   # whether an item was dropped in mode 'a'
+        if 'a' in mode:
+            self.zipf = self.__open_for_append(file)
+        elif 'w' in mode:
+            self.zipf = ZipFile(file, 'w', compression=ZIP_DEFLATED,
+                                allowZip64=True)
         else:
             self.zipf = ZipFile(file, 'r')
 
     def close(self):
         """
         Close the |ZipFileSystem| instance, necessary to complete the write
-        process with the instance is opened for writing.
+        process with the instance is opened for writing. In mode 'a', when
+        items were dropped but none appended, the smallest remaining item is
+        appended again so a new zip directory is written after it.
         """
-        self.zipf.close()
+        if self.__appendf is None:
+            self.zipf.close()
+            return
+        for zinfo in list(self.zipf.filelist):
+            if '/%s' % zinfo.filename not in self.__written:
+                self.__drop(zinfo)
+        if self.__dropped and not self.zipf.filelist:
+            # nothing left to keep, so write an empty archive
+            self.zipf.close()
+            self.__appendf.seek(0)
+            self.__appendf.truncate()
+            ZipFile(self.__appendf, 'w').close()
+        else:
+            # ZipFile writes a new zip directory only once an item is
+            # appended; with nothing changed the file is left as it is
+            if self.__dropped and not self.__appended:
+                self.__rewrite_item()
+            self.zipf.close()
+            if self.__appended or self.__dropped:
+                # the new directory can be shorter than the one it overwrote
+                self.__appendf.truncate()
+        if self.__appendf is not self.__file:
+            self.__appendf.close()
+
+    def getblobref(self, itemURI):
+        """
+        Return |Blob| containing the item identified by *itemURI*, for a
+        binary item. When the archive was opened by path and a
+        :data:`pptx.blobstore.memory_budget` is set, the blob refers to the
+        item in the archive rather than holding a copy of it.
+        """
+        if (self.__path is None or self.__mode != 'r' or
+                blobstore.memory_budget is None):
+            return super(ZipFileSystem, self).getblobref(itemURI)
+        if itemURI not in self:
+            raise LookupError("No package item with URI '%s'" % itemURI)
+        zinfo = self.zipf.getinfo(itemURI[1:])
+        return blobstore.from_zip_entry(self.__path, zinfo)
 
     def getstream(self, itemURI):
         """
@@ -832,32 +971,403 @@ class ZipFileSystem(BaseFileSystem):
 
     def write_blob(self, blob, itemURI):
         """
-        Write *blob* to zip file as binary stream named *itemURI*.
+        Write *blob*, a byte string or a |Blob|, to zip file as binary stream
+        named *itemURI*. A |Blob| not held in memory is copied from its
+        temporary file, or by way of one from the zip archive it was loaded
+        from, without being read into memory.
         """
-        if itemURI in self:
+        if itemURI in self.__written:
             tmpl = "Item with URI '%s' already in package"
             raise DuplicateKeyError(tmpl % itemURI)
+        self.__written.add(itemURI)
         membername = itemURI[1:]  # trim off leading slash
-        self.zipf.writestr(membername, blob)
+        if not isinstance(blob, blobstore.Blob):
+            blob = _BytesBlob(blob)
+        zinfo = self.zipf.NameToInfo.get(membername)
+        if zinfo is not None:
+            if zinfo.file_size == blob.size and zinfo.CRC == blob.crc32:
+                return
+            self.__drop(zinfo)
+        self.__appended = True
+        if blob.path is not None:
+            self.__write(membername, blob.path)
+        elif not blob.in_memory:
+            self.__write_copy(membername, blob)
+        else:
+            self.__writestr(membername, blob.read())
 
     def write_element(self, element, itemURI):
         """
         Write *element* to zip file as an XML document named *itemURI*.
         """
-        if itemURI in self:
-            tmpl = "Item with URI '%s' already in package"
-            raise DuplicateKeyError(tmpl % itemURI)
-        membername = itemURI[1:]  # trim off leading slash
         xml = etree.tostring(element, encoding='UTF-8', pretty_print=True,
                              standalone=True)
-        xml = prettify_nsdecls(xml)
-        self.zipf.writestr(membername, xml)
+        self.write_blob(prettify_nsdecls(xml), itemURI)
+
+    def __drop(self, zinfo):
+        """
+        Remove the item described by *zinfo* from the zip directory written
+        on close, leaving its bytes in the file.
+        """
+        self.zipf.filelist.remove(zinfo)
+        del self.zipf.NameToInfo[zinfo.filename]
+        self.__dropped = True
+
+    def __open_for_append(self, file):
+        """
+        Return a |ZipFile| for updating the package in *file* in place,
+        positioned to write over the existing zip directory.
+        """
+        if not is_zipfile(file):
+            raise PackageNotFoundError("Package not found at '%s'" % file)
+        self.__file = file
+        if isinstance(file, basestring):
+            self.__appendf = open(file, 'r+b')
+        else:
+            self.__appendf = file
+            file.seek(0)
+        return ZipFile(self.__appendf, 'a', compression=ZIP_DEFLATED,
+                       allowZip64=True)
+
+    def __rewrite_item(self):
+        """
+        Append a copy of the smallest item in the zip directory in place of
+        the item itself, so ZipFile writes a new zip directory on close when
+        items were dropped but none appended.
+        """
+        zinfo = min(self.zipf.filelist, key=lambda zinfo: zinfo.compress_size)
+        # reading moves the file position off the old zip directory
+        position = self.__appendf.tell()
+        bytes_ = self.zipf.read(zinfo)
+        self.__appendf.seek(position)
+        self.__drop(zinfo)
+        self.zipf.writestr(zinfo, bytes_)
+
+    def __write(self, membername, path):
+        """Copy file at *path* to zip file as member named *membername*."""
+        with phase('write', itemURI='/%s' % membername) as ph:
+            self.zipf.write(path, membername)
+            zinfo = self.zipf.filelist[-1]
+            ph.set(bytes=zinfo.file_size,
+                   compressed_bytes=zinfo.compress_size)
+
+    def __write_copy(self, membername, blob):
+        """
+        Write *blob* to zip file as member named *membername* from a
+        temporary copy of its contents, made a chunk at a time.
+        """
+        fd, path = tempfile.mkstemp(prefix='pptx-', dir=blobstore.spill_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                blob.copy_to(f)
+            self.__write(membername, path)
+        finally:
+            os.remove(path)
+
+    def __writestr(self, membername, bytes_):
+        """Write *bytes_* to zip file as member named *membername*."""
+        with phase('write', itemURI='/%s' % membername) as ph:
+            self.zipf.writestr(membername, bytes_)
+            ph.set(bytes=len(bytes_),
+                   compressed_bytes=self.zipf.filelist[-1].compress_size)
+
+
+class _BytesBlob(object):
+    """
+    Stand-in for a |Blob| wrapping a byte string, so XML items can be
+    written the same way as binary ones without going through the blob
+    store.
+    """
+    def __init__(self, bytes_):
+        super(_BytesBlob, self).__init__()
+        self.__bytes = bytes_
+        self.in_memory = True
+        self.path = None
+        self.size = len(bytes_)
+
+    @property
+    def crc32(self):
+        return crc32(self.__bytes) & 0xFFFFFFFF
+
+    def read(self):
+        return self.__bytes
+
+
+# ============================================================================
+# Streaming readers
+# ============================================================================
+
+class PresentationInfo(object):
+    """
+    Summary of a presentation, returned by :func:`probe`. Not intended to be
+    constructed directly.
+
+    .. attribute:: slide_count
+
+       Number of slides in the presentation.
+
+    .. attribute:: slide_width
+
+       Width of the slides in English Metric Units (EMU), an integer.
+
+    .. attribute:: slide_height
+
+       Height of the slides in EMU.
+
+    .. attribute:: layout_names
+
+       Tuple of the names of the slide layouts of each slide master, in the
+       order of :attr:`Presentation.slidelayouts`, e.g. ``('Title Slide',
+       'Title and Content', ...)``.
+
+    .. attribute:: core_properties
+
+       Dict of the document core properties, keyed by element name without
+       namespace prefix, e.g. ``{'title': 'Q3 Results', 'creator': 'Joe',
+       'revision': '4', 'modified': '2012-12-17T06:54:44Z', ...}``. Empty if
+       the package has no core properties part.
+    """
+    def __init__(self):
+        super(PresentationInfo, self).__init__()
+        self.slide_count = 0
+        self.slide_width = None
+        self.slide_height = None
+        self.layout_names = ()
+        self.core_properties = {}
+
+
+def probe(file):
+    """
+    Return a |PresentationInfo| summarizing the presentation in *file*, a path
+    or file-like object. Only the package items holding the summary are read
+    and slide parts aren't read at all, so this is much faster than loading
+    the presentation. Raises |InvalidPackageError| if *file* holds a package
+    that isn't a presentation.
+    """
+    fs = FileSystem(file)
+    try:
+        info = PresentationInfo()
+        pkg_rels = _rel_targets(fs, PKG_BASE_URI)
+        prs_partname = _presentation_partname(fs, pkg_rels)
+        prs_rels = _rel_targets(fs, prs_partname)
+        prs_elm = fs.getelement(prs_partname)
+
+        info.slide_count = len(prs_elm.findall(
+            '%s/%s' % (qtag('p:sldIdLst'), qtag('p:sldId'))))
+        sldSz = prs_elm.find(qtag('p:sldSz'))
+        if sldSz is not None:
+            info.slide_width = int(sldSz.get('cx'))
+            info.slide_height = int(sldSz.get('cy'))
+
+        layout_names = []
+        sldMasterIds = prs_elm.iterfind(
+            '%s/%s' % (qtag('p:sldMasterIdLst'), qtag('p:sldMasterId')))
+        for sldMasterId in sldMasterIds:
+            master_partname = prs_rels[sldMasterId.get(qtag('r:id'))][1]
+            layout_names.extend(_layout_names(fs, master_partname))
+        info.layout_names = tuple(layout_names)
+
+        for reltype, partname in pkg_rels.values():
+            if reltype == RT_COREPROPS:
+                core_elm = fs.getelement(partname)
+                info.core_properties = dict(
+                    (etree.QName(child).localname, child.text or '')
+                    for child in core_elm.iterchildren(tag=etree.Element))
+        return info
+    finally:
+        fs.close()
+
+
+def iter_text(file):
+    """
+    Generate a ``(slide_no, shape_id, text)`` 3-tuple for each shape that
+    contains text in the presentation in *file*, a path or file-like object,
+    without loading the package or building the object model. *slide_no* is
+    the 1-based position of the slide in the presentation, *shape_id* is the
+    shape's integer id, and *text* is the text of the shape's paragraphs
+    joined with newlines. Shapes in a group are generated individually; the
+    text of all the cells in a table is generated for its graphic frame.
+
+    Each slide is parsed incrementally and the elements of each shape are
+    discarded once it is finished, so memory use depends on the size of the
+    largest slide part rather than the size of the presentation.
+    """
+    fs = FileSystem(file)
+    try:
+        for slide_no, partname in enumerate(_slide_partnames(fs), 1):
+            stream = fs.getstream(partname)
+            for shape_id, text in _iter_shape_text(stream):
+                yield slide_no, shape_id, text
+            stream.close()
+    finally:
+        fs.close()
+
+
+def _iter_shape_text(stream):
+    """
+    Generate a ``(shape_id, text)`` 2-tuple for each shape containing text in
+    the slide XML in *stream*.
+    """
+    shape_tags = frozenset(qtag(tag) for tag in
+                           ('p:sp', 'p:pic', 'p:graphicFrame', 'p:cxnSp'))
+    cNvPr_tag, p_tag = qtag('p:cNvPr'), qtag('a:p')
+    t_tag, br_tag = qtag('a:t'), qtag('a:br')
+    shapes = []     # stack of [shape_id, paragraphs], for nested shapes
+    paragraph = []  # text fragments of paragraph being parsed
+    for event, elm in etree.iterparse(stream, events=('start', 'end'),
+                                      **_parser_options()):
+        tag = elm.tag
+        if event == 'start':
+            if tag in shape_tags:
+                shapes.append([None, []])
+            elif tag == cNvPr_tag and shapes and shapes[-1][0] is None:
+                shapes[-1][0] = int(elm.get('id'))
+        elif tag == t_tag:
+            paragraph.append(elm.text or u'')
+        elif tag == br_tag:
+            paragraph.append(u'\n')
+        elif tag == p_tag:
+            if shapes:
+                shapes[-1][1].append(u''.join(paragraph))
+            paragraph = []
+        elif tag in shape_tags:
+            shape_id, paragraphs = shapes.pop()
+            text = u'\n'.join(paragraphs)
+            if text:
+                yield shape_id, text
+            # discard the finished shape and any parsed before it
+            if not shapes:
+                elm.clear()
+                while elm.getprevious() is not None:
+                    del elm.getparent()[0]
+
+
+def _rel_targets(fs, partname):
+    """
+    Return dict mapping rId to a ``(reltype, target_partname)`` 2-tuple for
+    each internal relationship of the part *partname* in *fs*. A *partname*
+    of ``'/'`` gets the package relationships.
+    """
+    if partname == PKG_BASE_URI:
+        baseURI, relsitemURI = PKG_BASE_URI, Package.PKG_RELSITEM_URI
+    else:
+        baseURI, filename = posixpath.split(partname)
+        relsitemURI = posixpath.join(baseURI, '_rels', '%s.rels' % filename)
+    targets = {}
+    for rel_elm in fs.getelement(relsitemURI).iter(qtag('pr:Relationship')):
+        if rel_elm.get('TargetMode') == 'External':
+            continue
+        target = posixpath.join(baseURI, rel_elm.get('Target'))
+        targets[rel_elm.get('Id')] = (rel_elm.get('Type'),
+                                      posixpath.normpath(target))
+    return targets
+
+
+def _layout_names(fs, master_partname):
+    """
+    Return list of names of the slide layouts of the slide master
+    *master_partname* in *fs*, in the master's layout order. The master is
+    parsed only as far as its ``<p:sldLayoutIdLst>`` element, and layout parts
+    only as far as the ``<p:cSld>`` element holding the name.
+    """
+    master_rels = _rel_targets(fs, master_partname)
+    names = []
+    for rId in _layout_rIds(fs, master_partname):
+        layout_partname = master_rels[rId][1]
+        stream = fs.getstream(layout_partname)
+        for event, cSld in etree.iterparse(stream, events=('start',),
+                                           tag=qtag('p:cSld'),
+                                           **_parser_options()):
+            names.append(cSld.get('name', ''))
+            break
+        stream.close()
+    return names
+
+
+def _layout_rIds(fs, master_partname):
+    """
+    Return list of the rIds of the slide layouts of the slide master
+    *master_partname* in *fs*, in the master's layout order. The master is
+    parsed only as far as its ``<p:sldLayoutIdLst>`` element, discarding the
+    shapes parsed before it.
+    """
+    cSld_tag = qtag('p:cSld')
+    sldLayoutId_tag = qtag('p:sldLayoutId')
+    sldLayoutIdLst_tag = qtag('p:sldLayoutIdLst')
+    rIds = []
+    stream = fs.getstream(master_partname)
+    for event, elm in etree.iterparse(stream, events=('end',),
+                                      **_parser_options()):
+        tag = elm.tag
+        if tag == sldLayoutId_tag:
+            rIds.append(elm.get(qtag('r:id')))
+        elif tag == sldLayoutIdLst_tag:
+            break
+        elif tag == cSld_tag:
+            elm.clear()
+    stream.close()
+    return rIds
+
+
+def _presentation_partname(fs, pkg_rels):
+    """
+    Return the partname of the main document part in *fs*, *pkg_rels* being
+    the package relationships as returned by :func:`_rel_targets`. Raises
+    |InvalidPackageError| if there is none or it isn't a presentation.
+    """
+    for reltype, partname in pkg_rels.values():
+        if reltype == RT_OFFICEDOCUMENT:
+            break
+    else:
+        raise InvalidPackageError("Package has no main document part")
+    content_type = _ContentTypesItem().load(fs)[partname]
+    if content_type not in (CT_PRESENTATION, CT_TEMPLATE, CT_SLIDESHOW):
+        tmpl = "Not a presentation content type, got '%s'"
+        raise InvalidPackageError(tmpl % content_type)
+    return partname
+
+
+def _slide_partnames(fs):
+    """
+    Return list of partnames of the slides in *fs*, in presentation order.
+    """
+    prs_partname = _presentation_partname(fs, _rel_targets(fs, PKG_BASE_URI))
+    prs_rels = _rel_targets(fs, prs_partname)
+    sldIds = fs.getelement(prs_partname).iterfind(
+        '%s/%s' % (qtag('p:sldIdLst'), qtag('p:sldId')))
+    return [prs_rels[sldId.get(qtag('r:id'))][1] for sldId in sldIds]
 
 
 # ============================================================================
 # Utility functions
 # ============================================================================
 
+def _relsitem_xml(rels):
+    """
+    Return a ``.rels`` item containing *rels*, a sequence of |Relationship|,
+    as UTF-8 encoded bytes. The XML is formatted as lxml pretty-prints it, so
+    the item is the same as one written from an element tree, but it's
+    produced without building one; a large deck has thousands of these.
+    """
+    if not rels:
+        return _XML_DECLARATION + '<Relationships xmlns="%s"/>\n' % (
+            pptx.spec.nsmap['pr'])
+    lines = ['<Relationships xmlns="%s">\n' % pptx.spec.nsmap['pr']]
+    lines.extend(rel._xml for rel in rels)
+    lines.append('</Relationships>\n')
+    return _XML_DECLARATION + ''.join(lines)
+
+
+def _xml_attr(value):
+    """
+    Return *value* escaped and quoted for use as an XML attribute value,
+    UTF-8 encoded, e.g. ``'"a &amp; b"'`` for ``'a & b'``.
+    """
+    if isinstance(value, unicode):
+        value = value.encode('utf-8')
+    return '"%s"' % escape(value, _XML_ATTR_ENTITIES)
+
+
 def prettify_nsdecls(xml):
     """
     Wrap and indent second and later attributes on the root element so
@@ -12,25 +12,32 @@ API classes for dealing with presentations and other objects one typically
 encounters as an end-user of the PowerPoint user interface.
 """
 
-import hashlib
-
 try:
     from PIL import Image as PIL_Image
 except ImportError:
     import Image as PIL_Image
 
+import hashlib
 import os
 import posixpath
 import weakref
 
+from copy import deepcopy
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+from StringIO import StringIO
+
+import pptx.blobstore as blobstore
 import pptx.packaging
 import pptx.spec as spec
 import pptx.util as util
 
 from pptx.constants import MSO
 from pptx.exceptions import InvalidPackageError
+from pptx.instrument import phase
 from pptx.oxml import (
-    _Element, _SubElement, oxml_fromstring, oxml_tostring, _get_or_add, qn)
+    _Element, _ElementTemplate, _nsdecls, _SubElement, oxml_fromstring,
+    oxml_tostring, _get_or_add, qn)
 
 from pptx.spec import namespaces
 from pptx.spec import (
@@ -44,22 +51,27 @@ from pptx.spec import (
     PH_ORIENT_VERT, PH_SZ_FULL)
 from pptx.spec import slide_ph_basenames
 
-from pptx.util import Px
+from pptx.util import Emu, Px
 
 import logging
 log = logging.getLogger('pptx.presentation')
-log.setLevel(logging.DEBUG)
-# log.setLevel(logging.INFO)
-ch = logging.StreamHandler()
-ch.setLevel(logging.DEBUG)
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - '
-                              '%(message)s')
-ch.setFormatter(formatter)
-log.addHandler(ch)
 
 # default namespace map for use in lxml calls
 _nsmap = namespaces('a', 'r', 'p')
 
+# file extension of images added from a stream, by their shared blob
+_stream_image_exts = weakref.WeakKeyDictionary()
+
+# optimized images cached by _optimized_image() before the cache is cleared
+_OPTIMIZED_IMAGE_CACHE_SIZE = 64
+
+# JPEG quality used when a JPEG image is downsampled but no quality is given
+_DEFAULT_JPEG_QUALITY = 85
+
+# optimized image bytes, |None| where the original was kept, by (SHA1 of
+# original, pixel size, quality)
+_optimized_images = {}
+
 
 def _child(element, child_tagname, nsmap=None):
     """
@@ -109,6 +121,14 @@ class Package(object):
     # track instances as weakrefs so .containing() can be computed
     __instances = []
 
+    #: Number of threads used to parse the XML parts of a package while it
+    #: loads, |None| for one per CPU. The default, 1, parses every part on
+    #: the calling thread. lxml releases the GIL while it parses, so a
+    #: package with megabytes of XML can load in less time on a multi-core
+    #: machine with more threads. The threads are started on the first such
+    #: load and kept for later ones.
+    parse_threads = 1
+
     def __init__(self, file=None):
         super(Package, self).__init__()
         self.__presentation = None
@@ -145,30 +165,143 @@ class Package(object):
         """
         return self.__presentation
 
-    def save(self, file):
+    def collect_garbage(self):
+        """
+        Remove each image relationship whose rId is not referenced in the
+        XML of its source part, e.g. left behind when a picture shape is
+        removed by editing the slide XML, along with any image part that
+        relationship leaves unreferenced. Relationships of other types, and
+        of parts not loaded as XML, are left as they are. Return the number
+        of bytes in the parts removed.
+        """
+        with phase('collect_garbage') as ph:
+            parts_before = self._parts
+            for part in parts_before:
+                element = part._untracked_element
+                if element is None:
+                    continue
+                rIds = set(element.xpath('//@r:*', namespaces=_nsmap))
+                for rel in part._relationships.rels_of_reltype(RT_IMAGE):
+                    if rel._rId not in rIds:
+                        part._remove_relationship(rel)
+            removed, reclaimed = self.__drop_unreachable(parts_before)
+            ph.set(parts=len(removed), bytes=reclaimed)
+        return reclaimed
+
+    def dedupe_media(self):
+        """
+        Collapse image parts having identical contents into one, the first in
+        partname order, retargeting the relationships to the others to it.
+        PowerPoint embeds a picture pasted more than once as a separate part
+        each time. Images are compared by size first, so only images sharing
+        a size are hashed. Return the number of bytes in the parts removed.
+        """
+        with phase('dedupe_media') as ph:
+            keepers = {}  # image kept for each (size, sha1)
+            duplicates = {}  # image kept for each duplicate image
+            by_size = {}
+            for image in self.__images:
+                by_size.setdefault(image._blobref.size, []).append(image)
+            for size, images in by_size.items():
+                if len(images) < 2:
+                    continue
+                for image in images:
+                    keeper = keepers.setdefault((size, image._sha1), image)
+                    if keeper is not image:
+                        duplicates[image] = keeper
+            parts_before = self._parts
+            if duplicates:
+                for part in parts_before:
+                    for rel in list(part._relationships):
+                        if rel._target in duplicates:
+                            part._retarget_relationship(
+                                rel, duplicates[rel._target])
+            removed, reclaimed = self.__drop_unreachable(parts_before)
+            ph.set(parts=len(removed), bytes=reclaimed)
+        return reclaimed
+
+    def save(self, file, append=False, collect_garbage=False,
+             dedupe_media=False):
         """
         Save this package to *file*, where *file* can be either a path to a
-        file (a string) or a file-like object.
+        file (a string) or a file-like object. If *append* is |True|, the
+        package already in *file* is updated in place rather than rewritten.
+        If *collect_garbage* is |True|, :meth:`collect_garbage` is called
+        first. If *dedupe_media* is |True|, :meth:`dedupe_media` is called
+        first.
+        """
+        if collect_garbage:
+            self.collect_garbage()
+        if dedupe_media:
+            self.dedupe_media()
+        with phase('marshal') as ph:
+            pkgng_pkg = pptx.packaging.Package().marshal(self)
+            ph.set(parts=len(pkgng_pkg.parts))
+        pkgng_pkg.save(file, append)
+
+    def __getstate__(self):
+        """
+        Pickle support. The pickled state is the marshaled package-side part
+        graph, so unpickling skips zip inflation, the content types item, and
+        relationship item parsing.
+        """
+        return pptx.packaging.Package().marshal(self)
+
+    def __setstate__(self, pkgng_pkg):
+        self.__presentation = None
+        self.__instances.append(weakref.ref(self))
+        self.__unmarshal(pkgng_pkg)
+
+    def _copy(self):
+        """
+        Return a new |Package| with the same contents as this one. The XML
+        tree of each part is copied rather than serialized and parsed again,
+        as it would be by a pickle round-trip, so many packages can be made
+        from one loaded template in less time.
         """
         pkgng_pkg = pptx.packaging.Package().marshal(self)
-        pkgng_pkg.save(file)
+        elements = dict((part.partname, deepcopy(part._untracked_element))
+                        for part in self._parts
+                        if part.partname.endswith('.xml'))
+        package = Package.__new__(Package)
+        package.__presentation = None
+        package.__instances.append(weakref.ref(package))
+        package.__unmarshal(pkgng_pkg, elements)
+        return package
 
     @property
     def _images(self):
         return self.__images
 
+    def __drop_unreachable(self, parts_before):
+        """
+        Drop the images in *parts_before*, the parts of this package before
+        relationships were removed or retargeted, that are no longer
+        reachable. Return a 2-tuple ``(removed, reclaimed)`` where *removed*
+        is the list of parts no longer reachable and *reclaimed* is the
+        number of bytes in them.
+        """
+        parts = set(self._parts)
+        removed = [part for part in parts_before if part not in parts]
+        self.__images._values[:] = [image for image in self.__images
+                                    if image in parts]
+        reclaimed = sum(part._blobref.size if part._blobref is not None
+                        else len(part._blob) for part in removed)
+        return removed, reclaimed
+
     @property
     def _relationships(self):
         return self.__relationships
 
-    def __load(self, pkgrels):
+    def __load(self, pkgrels, elements):
         """
         Load all the model-side parts and relationships from the on-disk
         package by loading package-level relationship parts and propagating
-        the load down the relationship graph.
+        the load down the relationship graph. *elements* is a dict of XML
+        part root elements already parsed, keyed by partname.
         """
         # keep track of which parts are already loaded
-        part_dict = {}
+        part_dict = _PartDict(elements)
 
         # discard any previously loaded relationships
         self.__relationships = _RelationshipCollection()
@@ -198,12 +331,41 @@ class Package(object):
         for image in image_parts:
             self.__images._loadpart(image)
 
+    def __parse_xml_parts(self, pkgparts):
+        """
+        Return dict of the root element of each XML part in *pkgparts*, keyed
+        by partname, parsed on the shared pool of parser threads. Return an
+        empty dict, leaving each part to be parsed as it loads, when there is
+        too little XML or too few threads to make parsing in parallel
+        worthwhile.
+        """
+        pkgparts = [pkgpart for pkgpart in pkgparts
+                    if pkgpart.partname.endswith('.xml')]
+        threads = self.parse_threads or cpu_count()
+        xml_bytes = sum(len(pkgpart.blob) for pkgpart in pkgparts)
+        if threads < 2 or xml_bytes < _PARALLEL_PARSE_MIN_BYTES:
+            return {}
+        elements = _parse_pool(threads).map(_parse_xml_part, pkgparts)
+        return dict((pkgpart.partname, element) for pkgpart, element
+                    in zip(pkgparts, elements))
+
     def __open(self, file):
         """
         Load presentation contained in *file* into this package.
         """
-        pkg = pptx.packaging.Package().open(file)
-        self.__load(pkg.relationships)
+        with phase('load'):
+            pkg = pptx.packaging.Package().open(file)
+            self.__unmarshal(pkg)
+
+    def __unmarshal(self, pkgng_pkg, elements=None):
+        """
+        Load the model-side parts from package-side package *pkgng_pkg*.
+        *elements* is a dict of the root element of each XML part, keyed by
+        partname, when they're already at hand.
+        """
+        if elements is None:
+            elements = self.__parse_xml_parts(pkgng_pkg.parts)
+        self.__load(pkgng_pkg.relationships, elements)
         # unmarshal relationships selectively for now
         for rel in self.__relationships:
             if rel._reltype == RT_OFFICEDOCUMENT:
@@ -248,6 +410,49 @@ class Package(object):
                 yield part
 
 
+# packages with less XML than this are parsed on the loading thread, as
+# handing the parts to the parser threads would take longer than it saves
+_PARALLEL_PARSE_MIN_BYTES = 1024 * 1024
+
+# thread pools XML parts are parsed on, keyed by number of threads, each
+# started by the first load to need it
+_parse_pools = {}
+
+
+def _parse_pool(threads):
+    """
+    Return the pool of *threads* threads XML parts are parsed on, starting
+    it if need be. The pool is kept for later loads, so each thread's parser
+    is reused rather than built again on every load.
+    """
+    pool = _parse_pools.get(threads)
+    if pool is None:
+        pool = _parse_pools[threads] = ThreadPool(threads)
+    return pool
+
+
+def _parse_xml_part(pkgpart):
+    """
+    Return the root element of XML package part *pkgpart*, parsed with the
+    oxml parser.
+    """
+    with phase('xml_parse', partname=pkgpart.partname) as ph:
+        element = oxml_fromstring(pkgpart.blob)
+        ph.set(bytes=len(pkgpart.blob))
+    return element
+
+
+class _PartDict(dict):
+    """
+    Dictionary of the model-side parts loaded so far, keyed by partname, as
+    passed down the relationship graph during load. *elements* is a dict of
+    XML part root elements parsed ahead of the load, keyed by partname.
+    """
+    def __init__(self, elements):
+        super(_PartDict, self).__init__()
+        self.elements = elements
+
+
 # ============================================================================
 # Base classes
 # ============================================================================
@@ -363,6 +568,14 @@ class _RelationshipCollection(Collection):
         # register as observer of partname changes
         relationship._target.add_observer(self)
 
+    def _removeitem(self, relationship):
+        """Remove *relationship* from this collection."""
+        self._values.remove(relationship)
+        self.__resequence()
+        target = relationship._target
+        if not [rel for rel in self._values if rel._target is target]:
+            target.remove_observer(self)
+
     @property
     def _next_rId(self):
         """
@@ -544,8 +757,11 @@ class ImageCollection(PartCollection):
         """
         # use Image constructor to validate and characterize image file
         image = Image(file)
-        # return matching image if found
+        # return matching image if found, only images the same size can match
+        size = image._blobref.size
         for existing_image in self._values:
+            if existing_image._blobref.size != size:
+                continue
             if existing_image._sha1 == image._sha1:
                 return existing_image
         # otherwise add it to collection and return new image
@@ -600,15 +816,13 @@ class BasePart(Observable):
     and is the class we instantiate for parts we don't unmarshal or manipulate
     yet.
 
-    .. attribute:: _element
-
-       ElementTree element for XML parts. ``None`` for binary parts.
-
     .. attribute:: _load_blob
 
        Contents of part as a byte string extracted from the package file. May
        be set to ``None`` by subclasses that override ._blob after content is
-       unmarshaled, to free up memory.
+       unmarshaled, to free up memory. The contents are held in a
+       :class:`pptx.blobstore.Blob`, available as ``_blobref``, so they may
+       be on disk until read.
 
     .. attribute:: _relationships
 
@@ -624,8 +838,10 @@ class BasePart(Observable):
         super(BasePart, self).__init__()
         self.__content_type = content_type
         self.__partname = None
-        self._element = None
-        self._load_blob = None
+        self.__element = None
+        self.__live = False  # element handed out, may change at any time
+        self.__xml = None    # serialized element, kept while not live
+        self.__blobref = None
         self._relationships = _RelationshipCollection()
 
     @property
@@ -633,18 +849,92 @@ class BasePart(Observable):
         """
         Default is to return unchanged _load_blob. Dynamic parts will
         override. Raises :class:`ValueError` if _load_blob is None.
+
+        An XML part is serialized the first time, and the result reused
+        each time after that until the part is changed, so saving a deck
+        again re-serializes only the parts changed since the last save.
         """
         if self.partname.endswith('.xml'):
-            assert self._element is not None, 'BasePart._blob is undefined '\
-                'for xml parts when part.__element is None'
-            xml = oxml_tostring(self._element, encoding='UTF-8',
-                                pretty_print=True, standalone=True)
+            assert self.__element is not None, 'BasePart._blob is '\
+                'undefined for xml parts when part.__element is None'
+            if self.__xml is not None:
+                return self.__xml
+            with phase('serialize', partname=self.partname) as ph:
+                xml = oxml_tostring(self.__element, encoding='UTF-8',
+                                    pretty_print=True, standalone=True)
+                ph.set(bytes=len(xml))
+            if not self.__live:
+                self.__xml = xml
             return xml
         # default for binary parts is to return _load_blob unchanged
-        assert self._load_blob, "BasePart._blob called on part with no "\
+        assert self.__blobref, "BasePart._blob called on part with no "\
             "_load_blob; perhaps _blob not overridden by sub-class?"
         return self._load_blob
 
+    @property
+    def _element(self):
+        """
+        Root element of this part, |None| for a binary part. Whoever gets the
+        element may change its tree at any later time, so getting or setting
+        it marks this part as changed for good; from then on the part is
+        serialized on every save.
+        """
+        self.__live = True
+        self.__xml = None
+        return self.__element
+
+    @_element.setter
+    def _element(self, element):
+        self.__live = True
+        self.__xml = None
+        self.__element = element
+
+    @property
+    def _live(self):
+        """
+        |True| once the root element of this part has been handed out, after
+        which the part may change at any time.
+        """
+        return self.__live
+
+    @property
+    def _blobref(self):
+        """
+        |Blob| holding the contents of a binary part, |None| for an XML
+        part.
+        """
+        return self.__blobref
+
+    @_blobref.setter
+    def _blobref(self, blobref):
+        self.__blobref = blobref
+
+    @property
+    def _load_blob(self):
+        if self.__blobref is None:
+            return None
+        return self.__blobref.read()
+
+    @_load_blob.setter
+    def _load_blob(self, blob):
+        self.__blobref = None if blob is None else blobstore.from_bytes(blob)
+
+    @property
+    def _untracked_element(self):
+        """
+        Root element of this part, without marking the part as changed. For
+        part code that only reads the tree, or that calls
+        :meth:`_invalidate_blob` after changing it.
+        """
+        return self.__element
+
+    def _invalidate_blob(self):
+        """
+        Discard the serialized copy of this part, if any, so it is serialized
+        again on the next save.
+        """
+        self.__xml = None
+
     @property
     def _content_type(self):
         """
@@ -668,6 +958,8 @@ class BasePart(Observable):
 
     @partname.setter
     def partname(self, partname):
+        if partname != self.__partname:
+            self._invalidate_blob()
         self.__partname = partname
         self._notify_observers('partname', self.__partname)
 
@@ -679,8 +971,27 @@ class BasePart(Observable):
         rId = self._relationships._next_rId
         rel = _Relationship(rId, reltype, target_part)
         self._relationships._additem(rel)
+        self._invalidate_blob()
         return rel
 
+    def _remove_relationship(self, rel):
+        """
+        Remove relationship *rel* from the relationship collection of this
+        part.
+        """
+        self._relationships._removeitem(rel)
+        self._invalidate_blob()
+
+    def _retarget_relationship(self, rel, target_part):
+        """
+        Replace relationship *rel* of this part with one having the same rId
+        and reltype but targeting *target_part*.
+        """
+        self._relationships._removeitem(rel)
+        retargeted = _Relationship(rel._rId, rel._reltype, target_part)
+        self._relationships._additem(retargeted)
+        self._invalidate_blob()
+
     def _load(self, pkgpart, part_dict):
         """
         Load part and relationships from package part, and propagate load
@@ -689,15 +1000,21 @@ class BasePart(Observable):
         the on-disk package. *part_dict* is a dictionary of already-loaded
         parts, keyed by partname.
         """
-        # log.debug("loading part %s", pkgpart.partname)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("loading part %s", pkgpart.partname)
 
         # # set attributes from package part
         self.__content_type = pkgpart.content_type
         self.__partname = pkgpart.partname
+        self.__live = False
+        self.__xml = None
         if pkgpart.partname.endswith('.xml'):
-            self._element = oxml_fromstring(pkgpart.blob)
+            elements = getattr(part_dict, 'elements', {})
+            self.__element = elements.pop(pkgpart.partname, None)
+            if self.__element is None:
+                self.__element = _parse_xml_part(pkgpart)
         else:
-            self._load_blob = pkgpart.blob
+            self.__blobref = pkgpart._blobref
 
         # discard any previously loaded relationships
         self._relationships = _RelationshipCollection()
@@ -733,6 +1050,8 @@ class Presentation(BasePart):
         super(Presentation, self).__init__()
         self.__slidemasters = PartCollection()
         self.__slides = SlideCollection(self)
+        # (rId, slide) of each slide rel when sldIdLst was last rewritten
+        self.__sldIdLst_rels = None
 
     @property
     def slidemasters(self):
@@ -753,9 +1072,14 @@ class Presentation(BasePart):
     def _blob(self):
         """
         Rewrite sldId elements in sldIdLst before handing over to super for
-        transformation of _element into a blob.
-        """
-        self.__rewrite_sldIdLst()
+        transformation of _element into a blob. The rewrite is skipped when
+        the slide relationships are unchanged since the last one.
+        """
+        sld_rels = tuple((rel._rId, rel._target) for rel in
+                         self._relationships.rels_of_reltype(RT_SLIDE))
+        if sld_rels != self.__sldIdLst_rels:
+            self.__rewrite_sldIdLst()
+            self.__sldIdLst_rels = sld_rels
         # # at least the following needs to be added before using
         # # _reltype_ordering again for Presentation
         # self.__rewrite_notesMasterIdLst()
@@ -797,7 +1121,7 @@ class Presentation(BasePart):
         reflect current ordering of slide relationships and possible
         renumbering of ``rId`` values.
         """
-        sldIdLst = _child(self._element, 'p:sldIdLst', _nsmap)
+        sldIdLst = _child(self._untracked_element, 'p:sldIdLst', _nsmap)
         if sldIdLst is None:
             sldIdLst = self.__add_sldIdLst()
         sldIdLst.clear()
@@ -807,22 +1131,24 @@ class Presentation(BasePart):
             sldIdLst.append(sldId)
             sldId.set('id', str(256+idx))
             sldId.set(qn('r:id'), rel._rId)
+        self._invalidate_blob()
 
     def __add_sldIdLst(self):
         """
         Add a <p:sldIdLst> element to <p:presentation> in the right sequence
         among its siblings.
         """
-        sldIdLst = _child(self._element, 'p:sldIdLst', _nsmap)
+        presentation = self._untracked_element
+        sldIdLst = _child(presentation, 'p:sldIdLst', _nsmap)
         assert sldIdLst is None, '__add_sldIdLst() called where '\
                                  '<p:sldIdLst> already exists'
         sldIdLst = _Element('p:sldIdLst', _nsmap)
         # insert new sldIdLst element in right sequence
-        sldSz = _child(self._element, 'p:sldSz', _nsmap)
+        sldSz = _child(presentation, 'p:sldSz', _nsmap)
         if sldSz is not None:
             sldSz.addprevious(sldIdLst)
         else:
-            notesSz = _child(self._element, 'p:notesSz', _nsmap)
+            notesSz = _child(presentation, 'p:notesSz', _nsmap)
             notesSz.addprevious(sldIdLst)
         return sldIdLst
 
@@ -850,7 +1176,7 @@ class Image(BasePart):
     @property
     def _sha1(self):
         """Return SHA1 hash digest for image"""
-        return hashlib.sha1(self._blob).hexdigest()
+        return self._blobref.sha1
 
     @property
     def _blob(self):
@@ -899,19 +1225,91 @@ class Image(BasePart):
     def __load_image_from_file(self, file):
         """
         Load image from *file*, which is either a path to an image file or a
-        file-like object.
+        file-like object. The image is held in a shared blob, so the same
+        image added to any number of presentations is held in memory once.
         """
         if isinstance(file, basestring):  # file is a path
             path = file
             self.__ext = os.path.splitext(path)[1]
             self._content_type = self.__image_ext_content_type(self.__ext)
             with open(path, 'rb') as f:
-                self._load_blob = f.read()
+                self._blobref = blobstore.shared(f.read())
         else:  # assume file is a file-like object
-            self.__ext = self.__ext_from_image_stream(file)
-            self._content_type = self.__image_ext_content_type(self.__ext)
             file.seek(0)
-            self._load_blob = file.read()
+            self._blobref = blobstore.shared(file.read())
+            # an image already seen needn't be opened again to find its type
+            ext = _stream_image_exts.get(self._blobref)
+            if ext is None:
+                ext = self.__ext_from_image_stream(file)
+                _stream_image_exts[self._blobref] = ext
+            self.__ext = ext
+            self._content_type = self.__image_ext_content_type(self.__ext)
+
+
+def _optimized_image(file, cx, cy, dpi, quality):
+    """
+    Return *file*, a path to an image file or a file-like object containing
+    an image, or a file-like object containing that image optimized for
+    display at *cx* x *cy* EMU. If *dpi* is not |None|, an image having more
+    pixels than needed to show it at *dpi* dots per inch is downsampled,
+    keeping its aspect ratio. If *quality* is not |None|, a JPEG image is
+    recompressed at that quality, and a PNG image with PIL's optimizer, even
+    if it isn't downsampled. Images other than JPEG and PNG, and any image
+    that would come out no smaller, are returned as they are. Results are
+    cached, so inserting the same image at the same size again is free.
+    """
+    if isinstance(file, basestring):
+        with open(file, 'rb') as f:
+            blob = f.read()
+    else:
+        file.seek(0)
+        blob = file.read()
+    image = PIL_Image.open(StringIO(blob))
+    if image.format not in ('JPEG', 'PNG'):
+        return file
+    size = image.size
+    if dpi is not None:
+        needed = (Emu(cx).inches * dpi, Emu(cy).inches * dpi)
+        scale = min(1.0, max(needed[0] / size[0], needed[1] / size[1]))
+        size = tuple(max(1, int(round(n * scale))) for n in image.size)
+    if size == image.size and quality is None:
+        return file
+    key = (hashlib.sha1(blob).hexdigest(), size, quality)
+    if key not in _optimized_images:
+        optimized = _encode_image(image, size, quality)
+        if len(_optimized_images) >= _OPTIMIZED_IMAGE_CACHE_SIZE:
+            _optimized_images.clear()
+        _optimized_images[key] = (optimized if len(optimized) < len(blob)
+                                  else None)
+    optimized = _optimized_images[key]
+    return file if optimized is None else StringIO(optimized)
+
+
+def _encode_image(image, size, quality):
+    """
+    Return the bytes of PIL *image*, a JPEG or PNG image, resized to *size*
+    and encoded in its original format, at *quality* for a JPEG image. The
+    EXIF data of the image, including its orientation, and its ICC color
+    profile are kept, as is the palette of a palette image.
+    """
+    format = image.format
+    options = dict((key, image.info[key]) for key in ('exif', 'icc_profile')
+                   if image.info.get(key))
+    if size != image.size:
+        if image.mode == 'P':  # palette indexes can't be resampled
+            image = image.resize(size, PIL_Image.NEAREST)
+        else:
+            if image.mode == '1':  # no resampling filter for this mode
+                image = image.convert('L')
+            image = image.resize(size, PIL_Image.ANTIALIAS)
+    stream = StringIO()
+    if format == 'JPEG':
+        if quality is None:
+            quality = _DEFAULT_JPEG_QUALITY
+        image.save(stream, format, quality=quality, optimize=True, **options)
+    else:
+        image.save(stream, format, optimize=True, **options)
+    return stream.getvalue()
 
 
 # ============================================================================
@@ -967,22 +1365,41 @@ class BaseSlide(BasePart):
     @property
     def name(self):
         """Internal name of this slide-like object."""
-        cSld = self._element.cSld
+        cSld = self._untracked_element.cSld
         return cSld.get('name', default='')
 
     @property
     def shapes(self):
-        """Collection of shape objects belonging to this slide."""
+        """
+        Collection of shape objects belonging to this slide. Created on first
+        reference, so shapes of a slide that is never accessed aren't
+        unmarshalled.
+        """
+        # shapes handed out can change the element at any time, so this
+        # part is marked changed on every reference, not just the first
+        element = self._element
+        if self._shapes is None and element is not None:
+            self._shapes = ShapeCollection(element.cSld.spTree, self)
         assert self._shapes is not None, ("BaseSlide.shapes referenced "
                                           "before assigned")
         return self._shapes
 
+    @property
+    def _untracked_shapes(self):
+        """
+        Shape collection of this slide, without marking the part as changed.
+        For part code that only reads the shapes.
+        """
+        if self._shapes is not None:
+            return self._shapes
+        return ShapeCollection(self._untracked_element.cSld.spTree, self)
+
     def _load(self, pkgpart, part_dict):
         """Handle aspects of loading that are general to slide types."""
         # call parent to do generic aspects of load
         super(BaseSlide, self)._load(pkgpart, part_dict)
-        # unmarshal shapes
-        self._shapes = ShapeCollection(self._element.cSld.spTree, self)
+        # discard any shapes from prior load, unmarshalled on first reference
+        self._shapes = None
         # return self-reference to allow generative calling
         return self
 
@@ -991,14 +1408,18 @@ class Slide(BaseSlide):
     """
     Slide part. Corresponds to package files ppt/slides/slide[1-9][0-9]*.xml.
     """
+    __sld_tmpl = _ElementTemplate(
+        '<p:sld %s><p:cSld><p:spTree><p:nvGrpSpPr><p:cNvPr id="1" name=""/>'
+        '<p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr><p:grpSpPr/></p:spTree>'
+        '</p:cSld></p:sld>' % _nsdecls('a', 'p', 'r'))
+
     def __init__(self, slidelayout=None):
         super(Slide, self).__init__(CT_SLIDE)
         self.__slidelayout = slidelayout
         self._element = self.__minimal_element
-        self._shapes = ShapeCollection(self._element.cSld.spTree, self)
         # if slidelayout, this is a slide being added, not one being loaded
         if slidelayout:
-            self._shapes._clone_layout_placeholders(slidelayout)
+            self.shapes._clone_layout_placeholders(slidelayout)
             # add relationship to slideLayout part
             self._add_relationship(RT_SLIDELAYOUT, slidelayout)
 
@@ -1028,17 +1449,7 @@ class Slide(BaseSlide):
         Return element containing the minimal XML for a slide, based on what
         is required by the XMLSchema.
         """
-        sld = _Element('p:sld', _nsmap)
-        _SubElement(sld, 'p:cSld', _nsmap)
-        _SubElement(sld.cSld, 'p:spTree', _nsmap)
-        _SubElement(sld.cSld.spTree, 'p:nvGrpSpPr', _nsmap)
-        _SubElement(sld.cSld.spTree.nvGrpSpPr, 'p:cNvPr', _nsmap)
-        _SubElement(sld.cSld.spTree.nvGrpSpPr, 'p:cNvGrpSpPr', _nsmap)
-        _SubElement(sld.cSld.spTree.nvGrpSpPr, 'p:nvPr', _nsmap)
-        _SubElement(sld.cSld.spTree, 'p:grpSpPr', _nsmap)
-        sld.cSld.spTree.nvGrpSpPr.cNvPr.set('id', '1')
-        sld.cSld.spTree.nvGrpSpPr.cNvPr.set('name', '')
-        return sld
+        return self.__sld_tmpl.new()[0]
 
 
 class SlideLayout(BaseSlide):
@@ -1049,6 +1460,7 @@ class SlideLayout(BaseSlide):
     def __init__(self):
         super(SlideLayout, self).__init__(CT_SLIDELAYOUT)
         self.__slidemaster = None
+        self.__ph_prototypes = None
 
     @property
     def slidemaster(self):
@@ -1063,6 +1475,7 @@ class SlideLayout(BaseSlide):
         """
         # call parent to do generic aspects of load
         super(SlideLayout, self)._load(pkgpart, part_dict)
+        self.__ph_prototypes = None
 
         # selectively unmarshal relationships we need
         for rel in self._relationships:
@@ -1074,6 +1487,29 @@ class SlideLayout(BaseSlide):
         # return self-reference to allow generative calling
         return self
 
+    @property
+    def _placeholder_prototypes(self):
+        """
+        Sequence of ``<p:sp>`` elements a new slide based on this layout
+        starts with, as cached by :meth:`_cache_placeholder_prototypes`, or
+        |None| if there are none cached or this layout may have changed since
+        they were cached, i.e. its element or shapes have been handed out.
+        The elements are shared, each must be copied before use.
+        """
+        if self._live:
+            return None
+        return self.__ph_prototypes
+
+    def _cache_placeholder_prototypes(self, sps):
+        """
+        Cache copies of *sps*, the ``<p:sp>`` elements cloned from the
+        placeholders of this layout into an empty slide. Nothing is cached
+        for a layout that may change.
+        """
+        if self._live:
+            return
+        self.__ph_prototypes = tuple(deepcopy(sp) for sp in sps)
+
 
 class SlideMaster(BaseSlide):
     """
@@ -1120,6 +1556,9 @@ class BaseShape(object):
     Base class for shape objects. Both :class:`Shape` and :class:`Picture`
     inherit from :class:`BaseShape`.
     """
+    # shape and text objects are numerous, slots keep each one small
+    __slots__ = ('_element', '__nvXxPr')
+
     def __init__(self, shape_element):
         super(BaseShape, self).__init__()
         self._element = shape_element
@@ -1197,6 +1636,10 @@ class ShapeCollection(BaseShape, Collection):
     Sequence of shapes. Corresponds to CT_GroupShape in pml schema. Note that
     while spTree in a slide is a group shape, the group shape is recursive in
     that a group shape can include other group shapes within it.
+
+    Shape objects are created on first access, ``shapes[i]`` creates only the
+    one shape object. Until then the shape's element stands in for it in the
+    collection values.
     """
     _NVGRPSPPR = qn('p:nvGrpSpPr')
     _GRPSPPR = qn('p:grpSpPr')
@@ -1207,6 +1650,32 @@ class ShapeCollection(BaseShape, Collection):
     _PIC = qn('p:pic')
     _CONTENTPART = qn('p:contentPart')
     _EXTLST = qn('p:extLst')
+    _CNVPR = qn('p:cNvPr')
+
+    # skeletons of new shape elements, see _ElementTemplate
+    __ph_sp_xml = (
+        '<p:sp %s><p:nvSpPr><p:cNvPr id="" name=""/><p:cNvSpPr>'
+        '<a:spLocks noGrp="1"/></p:cNvSpPr><p:nvPr><p:ph/></p:nvPr>'
+        '</p:nvSpPr><p:spPr/>%%s</p:sp>' % _nsdecls('a', 'p', 'r'))
+    __ph_sp_tmpl = _ElementTemplate(__ph_sp_xml % '',
+                                    cNvPr='p:cNvPr', ph='p:ph')
+    __ph_sp_with_txBody_tmpl = _ElementTemplate(
+        __ph_sp_xml % '<p:txBody><a:bodyPr/><a:lstStyle/><a:p/></p:txBody>',
+        cNvPr='p:cNvPr', ph='p:ph')
+    __pic_tmpl = _ElementTemplate(
+        '<p:pic %s><p:nvPicPr><p:cNvPr id="" name=""/><p:cNvPicPr/><p:nvPr/>'
+        '</p:nvPicPr><p:blipFill><a:blip r:embed=""/><a:stretch><a:fillRect/>'
+        '</a:stretch></p:blipFill><p:spPr><a:xfrm><a:off x="" y=""/>'
+        '<a:ext cx="" cy=""/></a:xfrm><a:prstGeom prst="rect"><a:avLst/>'
+        '</a:prstGeom></p:spPr></p:pic>' % _nsdecls('a', 'p', 'r'),
+        cNvPr='p:cNvPr', blip='a:blip', off='a:off', ext='a:ext')
+    __sp_tmpl = _ElementTemplate(
+        '<p:sp %s><p:nvSpPr><p:cNvPr id="" name=""/><p:cNvSpPr/><p:nvPr/>'
+        '</p:nvSpPr><p:spPr><a:xfrm><a:off x="" y=""/><a:ext cx="" cy=""/>'
+        '</a:xfrm><a:prstGeom prst="rect"><a:avLst/></a:prstGeom><a:noFill/>'
+        '</p:spPr><p:txBody><a:bodyPr wrap="none"><a:spAutoFit/></a:bodyPr>'
+        '<a:lstStyle/><a:p/></p:txBody></p:sp>' % _nsdecls('a', 'p', 'r'),
+        cNvPr='p:cNvPr', cNvSpPr='p:cNvSpPr', off='a:off', ext='a:ext')
 
     def __init__(self, spTree, slide=None):
         # log.debug('ShapeCollect.__init__() called w/element 0x%X', id(spTree))
@@ -1214,24 +1683,29 @@ class ShapeCollection(BaseShape, Collection):
         self.__spTree = spTree
         self.__slide = slide
         self.__shapes = self._values
-        # unmarshal shapes
-        for elm in spTree.iterchildren():
-            # log.debug('elm.tag == %s', elm.tag[60:])
-            if elm.tag in (self._NVGRPSPPR, self._GRPSPPR, self._EXTLST):
-                continue
-            elif elm.tag == self._SP:
-                shape = Shape(elm)
-            elif elm.tag == self._PIC:
-                shape = Picture(elm)
-            elif elm.tag == self._GRPSP:
-                shape = ShapeCollection(elm)
-            elif elm.tag == self._CONTENTPART:
-                msg = "first time 'contentPart' shape encountered in the "\
-                      "wild, please let developer know and send example"
-                raise ValueError(msg)
-            else:
-                shape = BaseShape(elm)
-            self.__shapes.append(shape)
+        # lookup index by shape id, shape name and placeholder idx, built on
+        # first use, values are positions in self.__shapes
+        self.__ids = None
+        self.__names = None
+        self.__ph_idxs = None
+        self.__ph_positions = None
+        self.__placeholders = None
+        # shape elements stand in for their shape objects until accessed
+        non_shape_tags = (self._NVGRPSPPR, self._GRPSPPR, self._EXTLST)
+        self.__shapes.extend(elm for elm in spTree.iterchildren()
+                             if elm.tag not in non_shape_tags)
+
+    def __getitem__(self, key):
+        """Provides indexed access, (e.g. 'shapes[0]')."""
+        if isinstance(key, slice):
+            indices = range(*key.indices(len(self.__shapes)))
+            return [self.__shape(idx) for idx in indices]
+        return self.__shape(key)
+
+    def __iter__(self):
+        """Supports iteration (e.g. 'for shape in shapes: pass')."""
+        for idx in range(len(self.__shapes)):
+            yield self.__shape(idx)
 
     @property
     def placeholders(self):
@@ -1239,31 +1713,75 @@ class ShapeCollection(BaseShape, Collection):
         Immutable sequence containing the placeholder shapes in this shape
         collection, sorted in *idx* order.
         """
-        placeholders =\
-            [Placeholder(sp) for sp in self.__shapes if sp.is_placeholder]
-        placeholders.sort(key=lambda ph: ph.idx)
-        return tuple(placeholders)
+        if self.__placeholders is None:
+            self.__build_index()
+            # sort is stable, placeholders with equal idx stay in z-order
+            ph_positions = sorted(self.__ph_positions, key=lambda t: t[0])
+            self.__placeholders = tuple(Placeholder(self.__shape(pos))
+                                        for ph_idx, pos in ph_positions)
+        return self.__placeholders
 
     @property
     def title(self):
         """The title shape in collection or None if no title placeholder."""
-        for shape in self.__shapes:
-            if shape._is_title:
-                return shape
-        return None
+        self.__build_index()
+        # title placeholder is identified by idx of 0
+        pos = self.__ph_idxs.get(0)
+        return None if pos is None else self.__shape(pos)
+
+    def by_id(self, shape_id):
+        """
+        Return the shape in this collection having id *shape_id*. Raises
+        :exc:`KeyError` if there is no such shape.
+        """
+        self.__build_index()
+        return self.__shape(self.__ids[shape_id])
+
+    def by_name(self, name):
+        """
+        Return the first shape in this collection named *name*, e.g.
+        ``'Title 1'``. Raises :exc:`KeyError` if there is no such shape.
+        """
+        self.__build_index()
+        return self.__shape(self.__names[name])
+
+    def placeholder(self, idx):
+        """
+        Return the first placeholder in this collection having placeholder
+        idx *idx*, e.g. 0 for the title. Raises :exc:`KeyError` if there is no
+        such placeholder.
+        """
+        self.__build_index()
+        return Placeholder(self.__shape(self.__ph_idxs[idx]))
 
-    def add_picture(self, file, left, top, width=None, height=None):
+    def add_picture(self, file, left, top, width=None, height=None,
+                    dpi=None, quality=None):
         """
         Add picture shape displaying image in *file*, where *file* can be
         either a path to a file (a string) or a file-like object.
+
+        By default the image is embedded as it is. If *dpi* is given, a JPEG
+        or PNG image having more pixels than needed to show it at *dpi* dots
+        per inch at the size it is drawn is downsampled before it is
+        embedded, e.g. ``dpi=150`` for a presentation to be shown on screen.
+        If *quality* is given, a JPEG image is recompressed at that JPEG
+        quality, from 1 to 95, and a PNG image is recompressed as small as
+        PIL can make it. Either way, an image is only replaced by one that
+        is smaller.
         """
         pkg = Package.containing(self.__slide)
-        image = pkg._images.add_image(file)
+        if dpi is not None or quality is not None:
+            cx, cy = self.__picture_size(file, width, height)
+            image = pkg._images.add_image(
+                _optimized_image(file, cx, cy, dpi, quality))
+        else:
+            image = pkg._images.add_image(file)
         rel = self.__slide._add_relationship(RT_IMAGE, image)
         pic = self.__pic(rel._rId, file, left, top, width, height)
         self.__spTree.append(pic)
         picture = Picture(pic)
         self.__shapes.append(picture)
+        self.__update_index(pic)
         return picture
 
     def add_textbox(self, left, top, width, height):
@@ -1276,6 +1794,7 @@ class ShapeCollection(BaseShape, Collection):
         self.__spTree.append(sp)
         shape = Shape(sp)
         self.__shapes.append(shape)
+        self.__update_index(sp)
         return shape
 
     def _clone_layout_placeholders(self, slidelayout):
@@ -1284,8 +1803,27 @@ class ShapeCollection(BaseShape, Collection):
         placeholders is preserved. Latent placeholders (date, slide number,
         and footer) are not cloned.
         """
+        # placeholders cloned into an empty collection are the same each
+        # time, so the layout caches them and they are copied from there,
+        # unless the layout may have changed
+        cacheable = (not self.__shapes and self.__next_shape_id == 2 and
+                     not slidelayout._live)
+        if cacheable:
+            prototypes = slidelayout._placeholder_prototypes
+            if prototypes is not None:
+                for prototype in prototypes:
+                    sp = deepcopy(prototype)
+                    self.__spTree.append(sp)
+                    self.__shapes.append(sp)
+                    self.__update_index(sp)
+                return
+            # reading the layout shapes mustn't mark it as changed
+            layout_shapes = slidelayout._untracked_shapes
+        else:
+            layout_shapes = slidelayout.shapes
+
         latent_ph_types = (PH_TYPE_DT, PH_TYPE_SLDNUM, PH_TYPE_FTR)
-        for sp in slidelayout.shapes:
+        for sp in layout_shapes:
             if not sp.is_placeholder:
                 continue
             ph = Placeholder(sp)
@@ -1293,6 +1831,10 @@ class ShapeCollection(BaseShape, Collection):
                 continue
             self.__clone_layout_placeholder(ph)
 
+        if cacheable:
+            slidelayout._cache_placeholder_prototypes(
+                shape._element for shape in self)
+
     def __clone_layout_placeholder(self, layout_ph):
         """
         Add a new placeholder shape based on the slide layout placeholder
@@ -1308,24 +1850,27 @@ class ShapeCollection(BaseShape, Collection):
         self.__spTree.append(sp)
         shape = Shape(sp)
         self.__shapes.append(shape)
+        self.__update_index(sp)
         return shape
 
     def __new_placeholder_sp(self, layout_ph, id, ph_type, orient, shapename):
         """
         Assemble a new ``<p:sp>`` element based on the specified parameters.
         """
-        # form XML hierarchy
-        sp = _Element('p:sp', _nsmap)
-        _SubElement(sp, 'p:nvSpPr')
-        _SubElement(sp.nvSpPr, 'p:cNvPr')
-        sp.nvSpPr.cNvPr.set('id', str(id))
-        sp.nvSpPr.cNvPr.set('name', shapename)
-        _SubElement(sp.nvSpPr, 'p:cNvSpPr')
-        _SubElement(sp.nvSpPr.cNvSpPr, 'a:spLocks')
-        sp.nvSpPr.cNvSpPr[qn('a:spLocks')].set('noGrp', '1')
-
-        _SubElement(sp.nvSpPr, 'p:nvPr')
-        ph = _SubElement(sp.nvSpPr.nvPr, 'p:ph')
+        placeholder_types_that_have_a_text_frame = (
+            PH_TYPE_TITLE, PH_TYPE_CTRTITLE, PH_TYPE_SUBTITLE, PH_TYPE_BODY,
+            PH_TYPE_OBJ)
+
+        if ph_type in placeholder_types_that_have_a_text_frame:
+            sp, targets = self.__ph_sp_with_txBody_tmpl.new()
+        else:
+            sp, targets = self.__ph_sp_tmpl.new()
+
+        cNvPr = targets['cNvPr']
+        cNvPr.set('id', str(id))
+        cNvPr.set('name', shapename)
+
+        ph = targets['ph']
         if ph_type != PH_TYPE_OBJ:
             ph.set('type', ph_type)
         if layout_ph.orient != PH_ORIENT_HORZ:
@@ -1335,19 +1880,69 @@ class ShapeCollection(BaseShape, Collection):
         if layout_ph.idx != 0:
             ph.set('idx', str(layout_ph.idx))
 
-        _SubElement(sp, 'p:spPr')
+        return sp
 
-        placeholder_types_that_have_a_text_frame = (
-            PH_TYPE_TITLE, PH_TYPE_CTRTITLE, PH_TYPE_SUBTITLE, PH_TYPE_BODY,
-            PH_TYPE_OBJ)
+    def __build_index(self):
+        """
+        Build the lookup index of shapes by id, name, and placeholder idx if
+        it hasn't been built yet.
+        """
+        if self.__ids is not None:
+            return
+        self.__ids, self.__names, self.__ph_idxs = {}, {}, {}
+        self.__ph_positions = []
+        for pos, shape in enumerate(self.__shapes):
+            elm = shape._element if isinstance(shape, BaseShape) else shape
+            self.__index_shape(pos, elm)
 
-        if ph_type in placeholder_types_that_have_a_text_frame:
-            _SubElement(sp, 'p:txBody')
-            _SubElement(sp.txBody, 'a:bodyPr')
-            _SubElement(sp.txBody, 'a:lstStyle')
-            _SubElement(sp.txBody, 'a:p')
+    def __index_shape(self, pos, elm):
+        """
+        Add shape element *elm* at *pos* in the shapes sequence to the lookup
+        index. The first of shapes sharing a name or placeholder idx wins.
+        """
+        xpath = './*[1]/p:cNvPr | ./*[1]/p:nvPr/p:ph'
+        for child in elm.xpath(xpath, namespaces=_nsmap):
+            if child.tag == self._CNVPR:
+                self.__ids.setdefault(int(child.get('id')), pos)
+                self.__names.setdefault(child.get('name'), pos)
+            else:
+                ph_idx = int(child.get('idx', 0))
+                self.__ph_idxs.setdefault(ph_idx, pos)
+                self.__ph_positions.append((ph_idx, pos))
 
-        return sp
+    def __update_index(self, elm):
+        """
+        Add just-appended shape element *elm* to the lookup index, if the
+        index has been built.
+        """
+        if self.__ids is None:
+            return
+        self.__index_shape(len(self.__shapes)-1, elm)
+        self.__placeholders = None
+
+    def __shape(self, idx):
+        """
+        Return shape object at *idx*, creating it from its element on first
+        access.
+        """
+        shape = self.__shapes[idx]
+        if not isinstance(shape, BaseShape):
+            shape = self.__shapes[idx] = self.__new_shape(shape)
+        return shape
+
+    def __new_shape(self, elm):
+        """Return new shape object of the type appropriate to *elm*."""
+        if elm.tag == self._SP:
+            return Shape(elm)
+        elif elm.tag == self._PIC:
+            return Picture(elm)
+        elif elm.tag == self._GRPSP:
+            return ShapeCollection(elm)
+        elif elm.tag == self._CONTENTPART:
+            msg = "first time 'contentPart' shape encountered in the "\
+                  "wild, please let developer know and send example"
+            raise ValueError(msg)
+        return BaseShape(elm)
 
     def __next_ph_name(self, ph_type, id, orient):
         """
@@ -1403,74 +1998,53 @@ class ShapeCollection(BaseShape, Collection):
             filename = os.path.split(file)[1]
         else:
             filename = None
-            file.seek(0)
 
         # set cx and cy from image size if not specified
-        cx_px, cy_px = PIL_Image.open(file).size
-        cx = cx if cx is not None else Px(cx_px)
-        cy = cy if cy is not None else Px(cy_px)
+        cx, cy = self.__picture_size(file, cx, cy)
 
-        # assemble XML hierarchy of pic element
-        pic = _Element('p:pic', _nsmap)
-        _SubElement(pic, 'p:nvPicPr')
-        _SubElement(pic.nvPicPr, 'p:cNvPr')
-        pic.nvPicPr.cNvPr.set('id', str(id))
-        pic.nvPicPr.cNvPr.set('name', shapename)
+        # copy pic element skeleton and fill in values
+        pic, targets = self.__pic_tmpl.new()
+        cNvPr = targets['cNvPr']
+        cNvPr.set('id', str(id))
+        cNvPr.set('name', shapename)
         if filename:
-            pic.nvPicPr.cNvPr.set('descr', filename)
-        _SubElement(pic.nvPicPr, 'p:cNvPicPr')
-        _SubElement(pic.nvPicPr, 'p:nvPr')
-
-        _SubElement(pic, 'p:blipFill')
-        _SubElement(pic.blipFill, 'a:blip')
-        pic.blipFill[qn('a:blip')].set(qn('r:embed'), rId)
-        _SubElement(pic.blipFill, 'a:stretch')
-        _SubElement(pic.blipFill[qn('a:stretch')], 'a:fillRect')
-        _SubElement(pic, 'p:spPr')
-        _SubElement(pic.spPr, 'a:xfrm')
-        _SubElement(pic.spPr[qn('a:xfrm')], 'a:off')
-        pic.spPr[qn('a:xfrm')].off.set('x', str(x))
-        pic.spPr[qn('a:xfrm')].off.set('y', str(y))
-        _SubElement(pic.spPr[qn('a:xfrm')], 'a:ext')
-        pic.spPr[qn('a:xfrm')].ext.set('cx', str(cx))
-        pic.spPr[qn('a:xfrm')].ext.set('cy', str(cy))
-        _SubElement(pic.spPr, 'a:prstGeom')
-        pic.spPr[qn('a:prstGeom')].set('prst', 'rect')
-        _SubElement(pic.spPr[qn('a:prstGeom')], 'a:avLst')
+            cNvPr.set('descr', filename)
+        targets['blip'].set(qn('r:embed'), rId)
+        off, ext = targets['off'], targets['ext']
+        off.set('x', str(x))
+        off.set('y', str(y))
+        ext.set('cx', str(cx))
+        ext.set('cy', str(cy))
         return pic
 
+    @staticmethod
+    def __picture_size(file, cx, cy):
+        """
+        Return 2-tuple ``(cx, cy)`` with *cx* or *cy* replaced, where |None|,
+        by the width or height in pixels of the image in *file*.
+        """
+        if cx is not None and cy is not None:
+            return cx, cy
+        if not isinstance(file, basestring):
+            file.seek(0)
+        cx_px, cy_px = PIL_Image.open(file).size
+        cx = cx if cx is not None else Px(cx_px)
+        cy = cy if cy is not None else Px(cy_px)
+        return cx, cy
+
     def __sp(self, sp_id, shapename, x, y, cx, cy, is_textbox=False):
         """Return new ``<p:sp>`` element based on parameters."""
-        sp = _Element('p:sp', _nsmap)
-        _SubElement(sp, 'p:nvSpPr')
-        _SubElement(sp.nvSpPr, 'p:cNvPr')
-        sp.nvSpPr.cNvPr.set('id', str(sp_id))
-        sp.nvSpPr.cNvPr.set('name', shapename)
-        _SubElement(sp.nvSpPr, 'p:cNvSpPr')
+        sp, targets = self.__sp_tmpl.new()
+        cNvPr = targets['cNvPr']
+        cNvPr.set('id', str(sp_id))
+        cNvPr.set('name', shapename)
         if is_textbox:
-            sp.nvSpPr.cNvSpPr.set('txBox', '1')
-        _SubElement(sp.nvSpPr, 'p:nvPr')
-
-        _SubElement(sp, 'p:spPr')
-        _SubElement(sp.spPr, 'a:xfrm')
-        _SubElement(sp.spPr[qn('a:xfrm')], 'a:off')
-        sp.spPr[qn('a:xfrm')].off.set('x', str(x))
-        sp.spPr[qn('a:xfrm')].off.set('y', str(y))
-        _SubElement(sp.spPr[qn('a:xfrm')], 'a:ext')
-        sp.spPr[qn('a:xfrm')].ext.set('cx', str(cx))
-        sp.spPr[qn('a:xfrm')].ext.set('cy', str(cy))
-        _SubElement(sp.spPr, 'a:prstGeom')
-        sp.spPr[qn('a:prstGeom')].set('prst', 'rect')
-        _SubElement(sp.spPr[qn('a:prstGeom')], 'a:avLst')
-        _SubElement(sp.spPr, 'a:noFill')
-
-        _SubElement(sp, 'p:txBody')
-        _SubElement(sp.txBody, 'a:bodyPr')
-        sp.txBody[qn('a:bodyPr')].set('wrap', 'none')
-        _SubElement(sp.txBody[qn('a:bodyPr')], 'a:spAutoFit')
-        _SubElement(sp.txBody, 'a:lstStyle')
-        _SubElement(sp.txBody, 'a:p')
-
+            targets['cNvSpPr'].set('txBox', '1')
+        off, ext = targets['off'], targets['ext']
+        off.set('x', str(x))
+        off.set('y', str(y))
+        ext.set('cx', str(cx))
+        ext.set('cy', str(cy))
         return sp
 
 
@@ -1479,13 +2053,22 @@ class Placeholder(object):
     Decorator (pattern) class for adding placeholder properties to a shape
     that contains a placeholder element, e.g. ``<p:ph>``.
     """
+    # decorator class for each decorated shape class, created on first use
+    __decorator_classes = {}
+
     def __new__(cls, shape):
-        cls = type('PlaceholderDecorator', (Placeholder, shape.__class__), {})
-        return object.__new__(cls)
+        shape_cls = shape.__class__
+        decorator_cls = Placeholder.__decorator_classes.get(shape_cls)
+        if decorator_cls is None:
+            decorator_cls = type('PlaceholderDecorator',
+                                 (Placeholder, shape_cls), {})
+            Placeholder.__decorator_classes[shape_cls] = decorator_cls
+        return object.__new__(decorator_cls)
 
     def __init__(self, shape):
         self.__decorated = shape
         xpath = './*[1]/p:nvPr/p:ph'
+        # attributes are read on each access, the XML can change at any time
         self.__ph = self._element.xpath(xpath, namespaces=_nsmap)[0]
 
     def __getattr__(self, name):
@@ -1522,6 +2105,8 @@ class Picture(BaseShape):
     A picture shape, one that places an image on a slide. Corresponds to the
     ``<p:pic>`` element.
     """
+    __slots__ = ()
+
     def __init__(self, pic):
         super(Picture, self).__init__(pic)
 
@@ -1532,6 +2117,8 @@ class Shape(BaseShape):
     that can appear in any of the slide-type parts (slide, slideLayout,
     slideMaster, notesPage, notesMaster, handoutMaster).
     """
+    __slots__ = ()
+
     def __init__(self, shape_element):
         super(Shape, self).__init__(shape_element)
 
@@ -1546,6 +2133,10 @@ class TextFrame(object):
     frame. Corresponds to the ``<p:txBody>`` element that can appear as a
     child element of ``<p:sp>``. Not intended to be constructed directly.
     """
+    __slots__ = ('__txBody',)
+
+    _P = qn('a:p')
+
     def __init__(self, txBody):
         super(TextFrame, self).__init__()
         self.__txBody = txBody
@@ -1557,17 +2148,21 @@ class TextFrame(object):
         the paragraphs in this text frame. A text frame always contains at
         least one paragraph.
         """
-        xpath = './a:p'
-        p_elms = self.__txBody.xpath(xpath, namespaces=_nsmap)
-        paragraphs = []
-        for p in p_elms:
-            paragraphs.append(Paragraph(p))
-        return tuple(paragraphs)
+        return tuple(self.iter_paragraphs())
+
+    def iter_paragraphs(self):
+        """
+        Generate a :class:`Paragraph` instance for each paragraph in this
+        text frame, in document order. Unlike :attr:`paragraphs`, creates
+        each one only as it is reached.
+        """
+        for p in self.__txBody.iterchildren(self._P):
+            yield Paragraph(p)
 
     def _set_text(self, text):
         """Replace all text in text frame with single run containing *text*"""
         self.clear()
-        self.paragraphs[0].text = _to_unicode(text)
+        next(self.iter_paragraphs()).text = _to_unicode(text)
 
     #: Write-only. Assignment to *text* replaces all text currently contained
     #: in the text frame with the assigned expression. After assignment, the
@@ -1606,11 +2201,10 @@ class TextFrame(object):
         """
         Remove all paragraphs except one empty one.
         """
-        p_list = self.__txBody.xpath('./a:p', namespaces=_nsmap)
+        p_list = list(self.__txBody.iterchildren(self._P))
         for p in p_list[1:]:
             self.__txBody.remove(p)
-        p = self.paragraphs[0]
-        p.clear()
+        Paragraph(p_list[0]).clear()
 
 
 class _Font(object):
@@ -1621,6 +2215,8 @@ class _Font(object):
     in paragraph and ``<a:defRPr>`` in list style elements. Not intended to be
     constructed directly.
     """
+    __slots__ = ('__rPr',)
+
     def __init__(self, rPr):
         super(_Font, self).__init__()
         self.__rPr = rPr
@@ -1658,6 +2254,10 @@ class Paragraph(object):
     """
     Paragraph object. Not intended to be constructed directly.
     """
+    __slots__ = ('__p',)
+
+    _R = qn('a:r')
+
     def __init__(self, p):
         super(Paragraph, self).__init__()
         self.__p = p
@@ -1688,12 +2288,16 @@ class Paragraph(object):
         Immutable sequence of :class:`Run` instances corresponding to the runs
         in this paragraph.
         """
-        xpath = './a:r'
-        r_elms = self.__p.xpath(xpath, namespaces=_nsmap)
-        runs = []
-        for r in r_elms:
-            runs.append(Run(r))
-        return tuple(runs)
+        return tuple(self.iter_runs())
+
+    def iter_runs(self):
+        """
+        Generate a :class:`Run` instance for each run in this paragraph, in
+        document order. Unlike :attr:`runs`, creates each one only as it is
+        reached.
+        """
+        for r in self.__p.iterchildren(self._R):
+            yield Run(r)
 
     def _set_text(self, text):
         """Replace runs with single run containing *text*"""
@@ -1734,6 +2338,8 @@ class Run(object):
     """
     Text run object. Corresponds to ``<a:r>`` child element in a paragraph.
     """
+    __slots__ = ('__r',)
+
     def __init__(self, r):
         super(Run, self).__init__()
         self.__r = r
@@ -94,6 +94,7 @@ CT_SLIDEMASTER  = 'application/vnd.openxmlformats-officedocument.presentationml.
 CT_SLIDESHOW    = 'application/vnd.openxmlformats-officedocument.presentationml.slideshow.main+xml'
 CT_TEMPLATE     = 'application/vnd.openxmlformats-officedocument.presentationml.template.main+xml'
 
+RT_COREPROPS      = 'http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties'
 RT_HANDOUTMASTER  = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/handoutMaster'
 RT_IMAGE          = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/image'
 RT_NOTESMASTER    = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/notesMaster'
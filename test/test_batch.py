@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+#
+# test_batch.py
+#
+# Copyright (C) 2012, 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-pptx and is released under
+# the MIT License: http://www.opensource.org/licenses/mit-license.php
+
+"""Test suite for pptx.batch module."""
+
+import os
+import shutil
+import tempfile
+
+from mock import patch
+
+from .context import pptx
+
+import pptx.batch
+import pptx.presentation
+
+from pptx import Presentation
+from pptx.batch import render
+
+from testing import TestCase
+
+
+# module globals -------------------------------------------------------------
+def absjoin(*paths):
+    return os.path.abspath(os.path.join(*paths))
+
+thisdir = os.path.split(__file__)[0]
+test_file_dir = absjoin(thisdir, 'test_files')
+test_pptx_path = absjoin(test_file_dir, 'test.pptx')
+
+
+def _fill(prs, record):
+    """Fill function for tests, must be module-level to be picklable"""
+    if record is None:
+        raise ValueError('no data for record')
+    slide = prs.slides.add_slide(prs.slidelayouts[0])
+    slide.shapes.title.text = record
+
+
+class TestRender(TestCase):
+    """Test render()"""
+    def setUp(self):
+        self.out_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.out_dir)
+
+    def test_render_writes_one_presentation_per_record(self):
+        """render() writes a filled presentation for each record"""
+        # setup -----------------------
+        records = ['foo', 'bar', 'baz']
+        # exercise --------------------
+        result = render(test_pptx_path, records, _fill, self.out_dir,
+                        workers=1)
+        # verify ----------------------
+        expected = [absjoin(self.out_dir, '%06d.pptx' % idx)
+                    for idx in range(3)]
+        actual = result.paths
+        msg = "\nExpected: %s\n     Got: %s" % (expected, actual)
+        self.assertEqual(expected, actual, msg)
+        for path in result.paths:
+            prs = Presentation(path)
+            self.assertLength(prs.slides, 2)
+
+    def test_render_isolates_record_errors(self):
+        """render() reports failed records without stopping the batch"""
+        # setup -----------------------
+        records = ['foo', None, 'baz']
+        # exercise --------------------
+        result = render(test_pptx_path, records, _fill, self.out_dir,
+                        workers=2)
+        # verify ----------------------
+        self.assertEqual(3, result.count)
+        self.assertLength(result.paths, 2)
+        self.assertLength(result.errors, 1)
+        idx, record, error = result.errors[0]
+        self.assertEqual((1, None), (idx, record))
+        self.assertIn('ValueError', error)
+
+    def test_render_in_process_releases_template(self):
+        """render() with one worker doesn't keep the template snapshot"""
+        # exercise --------------------
+        render(test_pptx_path, ['foo'], _fill, self.out_dir, workers=1)
+        # verify ----------------------
+        self.assertIsNone(pptx.batch._template)
+
+    def test_render_parses_template_once(self):
+        """render() parses the template XML once, not once per record"""
+        # setup -----------------------
+        template = Presentation(test_pptx_path)
+        def parse_count(records):
+            with patch('pptx.presentation._parse_xml_part',
+                       wraps=pptx.presentation._parse_xml_part) as parse:
+                render(template, records, _fill, self.out_dir, workers=1)
+            return parse.call_count
+        # exercise --------------------
+        one_record = parse_count(['foo'])
+        three_records = parse_count(['foo', 'bar', 'baz'])
+        # verify ----------------------
+        self.assertEqual(one_record, three_records)
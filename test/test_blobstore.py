@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+#
+# test_blobstore.py
+#
+# Copyright (C) 2012, 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-pptx and is released under
+# the MIT License: http://www.opensource.org/licenses/mit-license.php
+
+"""Test suite for pptx.blobstore module."""
+
+import os
+import shutil
+import tempfile
+
+from mock import patch
+from StringIO import StringIO
+from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
+
+from .context import pptx
+
+import pptx.blobstore as blobstore
+
+from pptx.presentation import Package
+
+from testing import TestCase
+
+
+# module globals -------------------------------------------------------------
+def absjoin(*paths):
+    return os.path.abspath(os.path.join(*paths))
+
+thisdir = os.path.split(__file__)[0]
+test_file_dir = absjoin(thisdir, 'test_files')
+images_pptx_path = absjoin(test_file_dir, 'with_images.pptx')
+test_pptx_path = absjoin(test_file_dir, 'test.pptx')
+
+
+class ProxyWithoutSamefile(object):
+    """Stand-in for a module lacking its ``samefile`` attribute"""
+    def __init__(self, module):
+        self.__module = module
+
+    def __getattr__(self, name):
+        if name == 'samefile':
+            raise AttributeError(name)
+        return getattr(self.__module, name)
+
+
+class TestBlob(TestCase):
+    """Test Blob"""
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_blobs_over_budget_are_spilled_largest_first(self):
+        """from_bytes() spills the largest blobs when over budget"""
+        # exercise --------------------
+        with patch.multiple(blobstore, memory_budget=150,
+                            spill_dir=self.tmpdir):
+            small = blobstore.from_bytes('s' * 50)
+            large = blobstore.from_bytes('l' * 100)
+            medium = blobstore.from_bytes('m' * 75)
+        # verify ----------------------
+        self.assertEqual([None, None], [small.path, medium.path])
+        self.assertTrue(os.path.isfile(large.path))
+        self.assertEqual('l' * 100, large.read())
+
+    def test_blobs_within_budget_are_not_sorted(self):
+        """from_bytes() doesn't sort blobs while within budget"""
+        # exercise --------------------
+        with patch.multiple(blobstore, memory_budget=1024 ** 4,
+                            spill_dir=self.tmpdir):
+            with patch('pptx.blobstore.sorted', create=True) as sorted_:
+                blobs = [blobstore.from_bytes('b' * 10) for idx in range(8)]
+        # verify ----------------------
+        self.assertFalse(sorted_.called)
+        self.assertEqual([None] * 8, [blob.path for blob in blobs])
+
+    def test_blob_collected_in_memory_leaves_budget(self):
+        """Blob collected while in memory no longer counts against budget"""
+        # exercise --------------------
+        with patch.multiple(blobstore, memory_budget=150,
+                            spill_dir=self.tmpdir):
+            collected = blobstore.from_bytes('c' * 100)
+            del collected
+            blob = blobstore.from_bytes('b' * 100)
+        # verify ----------------------
+        self.assertIsNone(blob.path)
+
+    def test_spilled_file_removed_with_blob(self):
+        """Blob removes its temporary file when garbage collected"""
+        # setup -----------------------
+        blob = blobstore.from_bytes('foobar')
+        with patch.object(blobstore, 'spill_dir', self.tmpdir):
+            blob.spill()
+        path = blob.path
+        # exercise --------------------
+        del blob
+        # verify ----------------------
+        self.assertFalse(os.path.exists(path))
+
+    def test_from_zip_entry_reads_entry(self):
+        """from_zip_entry() blob reads stored and deflated entries"""
+        # setup -----------------------
+        path = os.path.join(self.tmpdir, 'test.zip')
+        zipf = ZipFile(path, 'w')
+        zipf.writestr('stored.bin', 'stored' * 10, ZIP_STORED)
+        zipf.writestr('deflated.bin', 'deflated' * 10, ZIP_DEFLATED)
+        zipf.close()
+        zipf = ZipFile(path)
+        # exercise --------------------
+        blobs = [blobstore.from_zip_entry(path, zipf.getinfo(name))
+                 for name in ('stored.bin', 'deflated.bin')]
+        # verify ----------------------
+        expected = ['stored' * 10, 'deflated' * 10]
+        actual = [blob.read() for blob in blobs]
+        self.assertEqual(expected, actual)
+        self.assertEqual(zipf.getinfo('stored.bin').CRC, blobs[0].crc32)
+
+    def test_copy_to_copies_zip_entry(self):
+        """Blob.copy_to() copies stored and deflated entries in chunks"""
+        # setup -----------------------
+        path = os.path.join(self.tmpdir, 'test.zip')
+        bytes_ = os.urandom(1000) * 200
+        zipf = ZipFile(path, 'w')
+        zipf.writestr('stored.bin', bytes_, ZIP_STORED)
+        zipf.writestr('deflated.bin', bytes_, ZIP_DEFLATED)
+        zipf.close()
+        zipf = ZipFile(path)
+        blobs = [blobstore.from_zip_entry(path, zipf.getinfo(name))
+                 for name in ('stored.bin', 'deflated.bin')]
+        # exercise --------------------
+        streams = [StringIO(), StringIO()]
+        with patch.object(blobstore, '_CHUNK_SIZE', 4096):
+            for blob, stream in zip(blobs, streams):
+                blob.copy_to(stream)
+        # verify ----------------------
+        self.assertEqual([bytes_, bytes_],
+                         [stream.getvalue() for stream in streams])
+
+    def test_shared_returns_one_blob_per_content(self):
+        """shared() returns the same blob for the same bytes"""
+        # exercise --------------------
+        blobs = [blobstore.shared(bytes_) for bytes_ in ('foo', 'bar', 'foo')]
+        # verify ----------------------
+        self.assertIs(blobs[0], blobs[2])
+        self.assertIsNot(blobs[0], blobs[1])
+
+    def test_save_over_source_keeps_media(self):
+        """Package saved over the file it was loaded from keeps its media"""
+        # setup -----------------------
+        path = os.path.join(self.tmpdir, 'with_images.pptx')
+        shutil.copy(images_pptx_path, path)
+        with patch.multiple(blobstore, memory_budget=0,
+                            spill_dir=self.tmpdir):
+            pkg = Package(path)
+            # exercise ----------------
+            pkg.save(path)
+        # verify ----------------------
+        original, saved = ZipFile(images_pptx_path), ZipFile(path)
+        self.assertIsNone(saved.testzip())
+        media = [name for name in original.namelist() if 'media' in name]
+        for name in media:
+            self.assertEqual(original.read(name), saved.read(name))
+
+
+class Test_samefile(TestCase):
+    """Test pptx.blobstore._samefile"""
+    def test_compares_normalized_paths_without_os_samefile(self):
+        """_samefile() compares normalized paths without os.path.samefile"""
+        # setup -----------------------
+        path = test_pptx_path
+        other_path = os.path.join(test_file_dir, '..', 'test_files',
+                                  'test.pptx')
+        # exercise --------------------
+        with patch.object(os, 'path', ProxyWithoutSamefile(os.path)):
+            same = blobstore._samefile(path, other_path)
+            different = blobstore._samefile(path, images_pptx_path)
+        # verify ----------------------
+        self.assertTrue(same, msg='expected same file')
+        self.assertFalse(different, msg='expected different files')
+
+
+class TestDefaultBlobs(TestCase):
+    """Test blobs of a package loaded with no memory budget set"""
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'with_images.pptx')
+        self.saved_path = os.path.join(self.tmpdir, 'saved.pptx')
+        shutil.copy(images_pptx_path, self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def assertMediaSaved(self):
+        original, saved = ZipFile(images_pptx_path), ZipFile(self.saved_path)
+        self.assertIsNone(saved.testzip())
+        media = [name for name in original.namelist() if 'media' in name]
+        for name in media:
+            self.assertEqual(original.read(name), saved.read(name))
+
+    def test_save_after_source_deleted(self):
+        """Package saves after the file it was loaded from is deleted"""
+        # setup -----------------------
+        pkg = Package(self.path)
+        os.remove(self.path)
+        # exercise --------------------
+        pkg.save(self.saved_path)
+        # verify ----------------------
+        self.assertMediaSaved()
+
+    def test_save_after_source_saved_over(self):
+        """Package saves after another saves over their source file"""
+        # setup -----------------------
+        pkg1, pkg2 = Package(self.path), Package(self.path)
+        layout = pkg1.presentation.slidemasters[0].slidelayouts[0]
+        pkg1.presentation.slides.add_slide(layout)
+        pkg1.save(self.path)
+        # exercise --------------------
+        pkg2.save(self.saved_path)
+        # verify ----------------------
+        self.assertMediaSaved()
+
+    def test_save_after_source_replaced(self):
+        """Package saves after its source is replaced by another package"""
+        # setup -----------------------
+        pkg = Package(self.path)
+        shutil.copy(test_pptx_path, self.path)
+        # exercise --------------------
+        pkg.save(self.saved_path)
+        # verify ----------------------
+        self.assertMediaSaved()
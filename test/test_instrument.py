@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+#
+# test_instrument.py
+#
+# Copyright (C) 2012, 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-pptx and is released under
+# the MIT License: http://www.opensource.org/licenses/mit-license.php
+
+"""Test suite for pptx.instrument module."""
+
+import logging
+import os
+
+from StringIO import StringIO
+
+from .context import pptx
+
+from pptx import instrument
+from pptx.instrument import phase, LogTrace, Recorder
+from pptx.presentation import Package
+
+from testing import TestCase
+
+
+# module globals -------------------------------------------------------------
+def absjoin(*paths):
+    return os.path.abspath(os.path.join(*paths))
+
+thisdir = os.path.split(__file__)[0]
+test_file_dir = absjoin(thisdir, 'test_files')
+test_pptx_path = absjoin(test_file_dir, 'test.pptx')
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestLogTrace(TestCase):
+    """Test LogTrace"""
+    def setUp(self):
+        self.handler = _ListHandler()
+        self.log = logging.getLogger('pptx.test.trace')
+        self.log.addHandler(self.handler)
+        self.log.setLevel(logging.DEBUG)
+
+    def tearDown(self):
+        self.log.removeHandler(self.handler)
+
+    def test_logs_each_event(self):
+        """LogTrace writes a log record for each event"""
+        # exercise --------------------
+        with LogTrace('pptx.test.trace'):
+            with phase('foo', bar=1):
+                pass
+        # verify ----------------------
+        self.assertLength(self.handler.records, 1)
+        record = self.handler.records[0]
+        self.assertEqual('foo', record.pptx_event['name'])
+        self.assertTrue(record.getMessage().startswith('foo '))
+        self.assertTrue(record.getMessage().endswith(' bar=1'))
+
+    def test_skips_formatting_when_level_disabled(self):
+        """LogTrace writes nothing when its logger level is disabled"""
+        # setup -----------------------
+        self.log.setLevel(logging.INFO)
+        # exercise --------------------
+        with LogTrace('pptx.test.trace'):
+            with phase('foo'):
+                pass
+        # verify ----------------------
+        self.assertLength(self.handler.records, 0)
+
+
+class TestPhase(TestCase):
+    """Test phase()"""
+    def test_phase_is_null_when_no_listeners(self):
+        """phase() returns shared null phase when no listener registered"""
+        # exercise --------------------
+        ph1 = phase('foo', bar=1)
+        ph2 = phase('baz')
+        # verify ----------------------
+        self.assertIs(ph1, instrument._NULL_PHASE)
+        self.assertIs(ph2, instrument._NULL_PHASE)
+
+    def test_phase_sends_event_to_listener(self):
+        """phase() sends named, timed event with fields to listener"""
+        # setup -----------------------
+        recorder = Recorder()
+        # exercise --------------------
+        with recorder:
+            with phase('foo', bar=1) as ph:
+                ph.set(baz=2)
+        with phase('foo'):
+            pass
+        # verify ----------------------
+        self.assertLength(recorder.events, 1)
+        event = recorder.events[0]
+        self.assertEqual(('foo', 1, 2),
+                         (event['name'], event['bar'], event['baz']))
+        self.assertTrue(event['seconds'] >= 0.0)
+
+    def test_remove_listener_stops_events(self):
+        """remove_listener() stops events to listener"""
+        # setup -----------------------
+        events = []
+        instrument.add_listener(events.append)
+        # exercise --------------------
+        instrument.remove_listener(events.append)
+        with phase('foo'):
+            pass
+        # verify ----------------------
+        self.assertLength(events, 0)
+
+
+    def test_listener_error_does_not_mask_phase_error(self):
+        """Error raised in phase propagates when a listener also raises"""
+        # setup -----------------------
+        def listener(event):
+            raise RuntimeError('listener failed')
+        instrument.add_listener(listener)
+        # exercise --------------------
+        try:
+            with self.assertRaises(KeyError):
+                with phase('foo'):
+                    raise KeyError('bar')
+        finally:
+            instrument.remove_listener(listener)
+
+class TestRecorder(TestCase):
+    """Test Recorder"""
+    def test_records_load_and_save_phases(self):
+        """Recorder captures the phases of a presentation load and save"""
+        # exercise --------------------
+        with Recorder() as recorder:
+            pkg = Package(test_pptx_path)
+            pkg.save(StringIO())
+        # verify ----------------------
+        totals = recorder.totals()
+        for name in ('pkg_open', 'content_types_load', 'read', 'rels_parse',
+                     'xml_parse', 'load', 'marshal', 'serialize', 'write',
+                     'pkg_save'):
+            msg = "expected phase '%s' in %s" % (name, sorted(totals))
+            self.assertIn(name, totals, msg)
+        self.assertEqual(1, totals['load']['count'])
+        self.assertTrue(totals['read']['bytes'] > 0)
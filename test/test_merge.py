@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+#
+# test_merge.py
+#
+# Copyright (C) 2012, 2013 Steve Canny scanny@cisco.com
+#
+# This module is part of python-pptx and is released under
+# the MIT License: http://www.opensource.org/licenses/mit-license.php
+
+"""Test suite for pptx.merge module."""
+
+from .context import pptx
+
+from pptx import Presentation
+from pptx.merge import MergeTemplate
+from pptx.oxml import _Element
+from pptx.spec import namespaces
+from pptx.util import Inches
+
+from testing import TestCase
+
+
+_nsmap = namespaces('a')
+
+
+def _prs_with_runs(*run_texts_per_paragraph):
+    """
+    Return presentation having one slide with a text box containing a
+    paragraph for each sequence of run texts in *run_texts_per_paragraph*.
+    """
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slidelayouts[6])
+    textbox = slide.shapes.add_textbox(0, 0, Inches(1), Inches(1))
+    textframe = textbox.textframe
+    for idx, run_texts in enumerate(run_texts_per_paragraph):
+        if idx == 0:
+            paragraph = textframe.paragraphs[0]
+        else:
+            paragraph = textframe.add_paragraph()
+        for text in run_texts:
+            paragraph.add_run().text = text
+    return prs, textframe
+
+
+def _run_texts(textframe):
+    return [[run.text for run in paragraph.runs]
+            for paragraph in textframe.paragraphs]
+
+
+class TestMergeTemplate(TestCase):
+    """Test MergeTemplate"""
+    def test_tokens_found(self):
+        """MergeTemplate.tokens contains names of tokens in slides"""
+        # setup -----------------------
+        prs, textframe = _prs_with_runs(['Dear {{ name }},'],
+                                        ['{{city}} is {{ weather }}'])
+        # exercise --------------------
+        template = MergeTemplate(prs)
+        # verify ----------------------
+        expected = frozenset(['name', 'city', 'weather'])
+        actual = template.tokens
+        msg = "expected %s, got %s" % (sorted(expected), sorted(actual))
+        self.assertEqual(expected, actual, msg)
+
+    def test_split_token_is_joined_into_first_run(self):
+        """MergeTemplate() gathers token split across runs into one run"""
+        # setup -----------------------
+        prs, textframe = _prs_with_runs(['Dear {{na', 'm', 'e}}, hi', '!'])
+        # exercise --------------------
+        template = MergeTemplate(prs)
+        # verify ----------------------
+        expected = [['Dear {{name}}', ', hi', '!']]
+        actual = _run_texts(textframe)
+        msg = "expected %s, got %s" % (expected, actual)
+        self.assertEqual(expected, actual, msg)
+        self.assertEqual(frozenset(['name']), template.tokens)
+
+    def test_split_token_is_not_joined_across_line_break(self):
+        """MergeTemplate() doesn't join runs separated by a line break"""
+        # setup -----------------------
+        prs, textframe = _prs_with_runs(['{{na', 'me}}'])
+        r = prs.slides[0]._element.xpath('//a:r', namespaces=_nsmap)[0]
+        r.addnext(_Element('a:br'))
+        # exercise --------------------
+        template = MergeTemplate(prs)
+        # verify ----------------------
+        self.assertEqual([['{{na', 'me}}']], _run_texts(textframe))
+        self.assertEqual(frozenset(), template.tokens)
+
+    def test_apply_substitutes_each_record(self):
+        """MergeTemplate.apply() fills tokens from original text each time"""
+        # setup -----------------------
+        prs, textframe = _prs_with_runs(['Dear {{', 'name}}, ', '{{n}}'])
+        template = MergeTemplate(prs)
+        # exercise --------------------
+        template.apply({'name': 'Joe', 'n': 1})
+        first = _run_texts(textframe)
+        template.apply({'name': u'Zoë', 'n': 2, 'unused': 3})
+        second = _run_texts(textframe)
+        # verify ----------------------
+        self.assertEqual([['Dear Joe', ', ', '1']], first)
+        self.assertEqual([[u'Dear Zoë', ', ', '2']], second)
+
+    def test_apply_raises_on_missing_token(self):
+        """MergeTemplate.apply() raises KeyError on token missing a value"""
+        # setup -----------------------
+        prs, textframe = _prs_with_runs(['{{a}} {{b}}'])
+        template = MergeTemplate(prs)
+        # verify ----------------------
+        with self.assertRaises(KeyError):
+            template.apply({'a': 'x'})
+        self.assertEqual([['{{a}} {{b}}']], _run_texts(textframe))
@@ -9,6 +9,8 @@
 
 """Test suite for pptx.oxml module."""
 
+import threading
+
 from hamcrest  import (assert_that, has_item, has_property, instance_of,
                        is_, is_not, equal_to, greater_than)
 from mock      import Mock, patch
@@ -17,7 +19,12 @@ from unittest2 import TestCase
 from lxml import etree
 from lxml.etree import Element
 
+import pptx.oxml
+
 # from pptx.oxml import CT_Shape, CT_ShapeNonVisual
+from pptx.oxml import (
+    _ElementTemplate, _nsdecls, _oxml_parser, _xml_parser, oxml_fromstring,
+    oxml_tostring)
 from pptx.packaging import prettify_nsdecls
 from pptx.spec import namespaces, qtag
 
@@ -83,3 +90,68 @@ def txbox_xml():
 #             assert_that(line, is_(equal_to(txbox_xml_lines[idx])))
 #     
 
+
+class Test_ElementTemplate(TestCase):
+    """Test _ElementTemplate class"""
+    def setUp(self):
+        xml = ('<p:sp %s><p:nvSpPr><p:cNvPr id="" name=""/></p:nvSpPr>'
+               '<p:spPr><a:xfrm><a:off x="" y=""/></a:xfrm></p:spPr>'
+               '</p:sp>' % _nsdecls('a', 'p'))
+        self.tmpl = _ElementTemplate(xml, cNvPr='p:cNvPr', off='a:off')
+
+    def test_new_returns_named_targets_in_copy(self):
+        """_ElementTemplate.new() returns copy and its named descendants"""
+        # exercise --------------------
+        sp, targets = self.tmpl.new()
+        targets['cNvPr'].set('id', '2')
+        targets['off'].set('x', '42')
+        # verify ----------------------
+        expected = (
+            '<p:sp %s><p:nvSpPr><p:cNvPr id="2" name=""/></p:nvSpPr>'
+            '<p:spPr><a:xfrm><a:off x="42" y=""/></a:xfrm></p:spPr>'
+            '</p:sp>' % _nsdecls('a', 'p'))
+        assert_that(oxml_tostring(sp), is_(equal_to(expected)))
+
+    def test_new_returns_independent_copies(self):
+        """_ElementTemplate.new() returns a new element on each call"""
+        # exercise --------------------
+        sp1, targets1 = self.tmpl.new()
+        targets1['cNvPr'].set('id', '2')
+        sp2, targets2 = self.tmpl.new()
+        # verify ----------------------
+        assert_that(sp2, is_not(sp1))
+        assert_that(targets2['cNvPr'].get('id'), is_(equal_to('')))
+
+
+class Test_pooled_parser(TestCase):
+    """Test the per-thread parser pool"""
+    def test_parser_is_reused_within_a_thread(self):
+        """_oxml_parser() returns the same parser on each call"""
+        assert_that(_oxml_parser(), is_(_oxml_parser()))
+        assert_that(_xml_parser(), is_(_xml_parser()))
+        assert_that(_xml_parser(), is_not(_oxml_parser()))
+
+    def test_each_thread_gets_its_own_parser(self):
+        """_oxml_parser() returns a different parser on another thread"""
+        # exercise --------------------
+        parsers = []
+        thread = threading.Thread(
+            target=lambda: parsers.append(_oxml_parser()))
+        thread.start()
+        thread.join()
+        # verify ----------------------
+        assert_that(parsers[0], is_not(_oxml_parser()))
+
+    def test_oxml_parser_is_importing_thread_parser(self):
+        """oxml_parser is the parser of the thread that imported oxml"""
+        assert_that(pptx.oxml.oxml_parser, is_(_oxml_parser()))
+
+    def test_huge_tree_opt_in(self):
+        """oxml_fromstring() parses a very deep tree only with huge_tree"""
+        # setup -----------------------
+        xml = '<a>' * 300 + '</a>' * 300
+        # verify ----------------------
+        with self.assertRaises(etree.XMLSyntaxError):
+            oxml_fromstring(xml)
+        with patch.object(pptx.oxml, 'huge_tree', True):
+            assert_that(oxml_fromstring(xml).tag, is_(equal_to('a')))
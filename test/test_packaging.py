@@ -10,26 +10,31 @@
 """Test suite for pptx.packaging module."""
 
 import os
+import pickle
+import zipfile
 
 from collections import namedtuple
 from hamcrest import assert_that, is_
 from lxml import etree
-from mock import Mock
+from mock import Mock, patch
 from StringIO import StringIO
 from zipfile import BadZipfile, ZipFile, is_zipfile
 
 from .context import pptx
 
+import pptx.blobstore as blobstore
 import pptx.presentation
 
 from pptx.exceptions import (
-    CorruptedPackageError, DuplicateKeyError, NotXMLError,
-    PackageNotFoundError)
+    CorruptedPackageError, DuplicateKeyError, InvalidPackageError,
+    NotXMLError, PackageNotFoundError)
 
 from pptx.packaging import (
-    _ContentTypesItem, DirectoryFileSystem, FileSystem, Package, Part,
-    PartTypeSpec, ZipFileSystem)
+    _ContentTypesItem, DirectoryFileSystem, FileSystem, iter_text, Package,
+    Part, PartTypeSpec, prettify_nsdecls, probe, Relationship,
+    _relsitem_xml, ZipFileSystem)
 
+from pptx.spec import qtag
 from pptx.spec import PTS_CARDINALITY_TUPLE, PTS_HASRELS_ALWAYS
 
 from testing import TestCase
@@ -43,6 +48,7 @@ thisdir = os.path.split(__file__)[0]
 test_file_dir = absjoin(thisdir, 'test_files')
 
 test_pptx_path = absjoin(test_file_dir, 'test.pptx')
+test_slides_pptx_path = absjoin(test_file_dir, 'test_slides.pptx')
 test_save_pptx_path = absjoin(thisdir, 'test_python-pptx.pptx')
 dir_pkg_path = absjoin(test_file_dir, 'expanded_pptx')
 zip_pkg_path = test_pptx_path
@@ -161,6 +167,19 @@ class Test_ContentTypesItem(TestCase):
         # verify ----------------------
         self.assertLength(self.cti.element, 24)
 
+    def test_xml_matches_serialized_element(self):
+        """_ContentTypesItem.xml matches serialized element"""
+        # setup -----------------------
+        pkg = Package().open(zip_pkg_path)
+        self.cti.compose(pkg.parts)
+        # exercise --------------------
+        xml = self.cti.xml
+        # verify ----------------------
+        expected = prettify_nsdecls(etree.tostring(
+            self.cti.element, encoding='UTF-8', pretty_print=True,
+            standalone=True))
+        self.assertEqual(expected, xml)
+
     def test_getitem_raises_before_load(self):
         """_ContentTypesItem[partname] raises before load"""
         # verify ----------------------
@@ -274,6 +293,61 @@ class TestFileSystem(TestCase):
             FileSystem(non_zip_stream)
 
 
+class TestIterText(TestCase):
+    """Test iter_text()"""
+    def test_generates_text_of_each_shape(self):
+        """iter_text() generates text of shapes, grouped and table too"""
+        # exercise --------------------
+        texts = list(iter_text(test_slides_pptx_path))
+        # verify ----------------------
+        expected = [
+            (1,  7, u'Test text'),
+            (1, 10, u'Group test text'),
+            (1, 12, u'Box 1'),
+            (1, 13, u'Box 2'),
+            (1, 16, u'Col head 1\nCol head 2\nCell text 1\nCell text 2'),
+        ]
+        msg = "\nExpected: %s\n     Got: %s" % (expected, texts)
+        self.assertEqual(expected, texts, msg)
+
+    def test_reads_slides_in_presentation_order(self):
+        """iter_text() numbers slides in sldIdLst order"""
+        # setup -----------------------
+        prs = pptx.Presentation()
+        for text in ('first', 'second', 'third'):
+            slide = prs.slides.add_slide(prs.slidelayouts[5])
+            slide.shapes.title.text = text
+        stream = StringIO()
+        prs.save(stream)
+        # exercise --------------------
+        texts = [(slide_no, text) for slide_no, shape_id, text
+                 in iter_text(stream)]
+        # verify ----------------------
+        expected = [(1, u'first'), (2, u'second'), (3, u'third')]
+        msg = "\nExpected: %s\n     Got: %s" % (expected, texts)
+        self.assertEqual(expected, texts, msg)
+
+    def test_raises_on_non_presentation_package(self):
+        """iter_text() raises on package that isn't a presentation"""
+        # setup -----------------------
+        stream = StringIO()
+        zipf = ZipFile(stream, 'w')
+        zipf.writestr('[Content_Types].xml', (
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/c'
+            'ontent-types"><Override PartName="/word/document.xml" ContentT'
+            'ype="application/vnd.openxmlformats-officedocument.wordprocess'
+            'ingml.document.main+xml"/></Types>'))
+        zipf.writestr('_rels/.rels', (
+            '<Relationships xmlns="http://schemas.openxmlformats.org/packag'
+            'e/2006/relationships"><Relationship Id="rId1" Type="http://sch'
+            'emas.openxmlformats.org/officeDocument/2006/relationships/offi'
+            'ceDocument" Target="word/document.xml"/></Relationships>'))
+        zipf.close()
+        # verify ----------------------
+        with self.assertRaises(InvalidPackageError):
+            list(iter_text(stream))
+
+
 class TestPackage(TestCase):
     """Test Package"""
     def setUp(self):
@@ -295,6 +369,14 @@ class TestPackage(TestCase):
         msg = "expected '%s', got '%s'" % (expected, actual)
         self.assertEqual(expected, actual, msg)
 
+    def test_import_adds_no_log_handlers(self):
+        """importing pptx.packaging attaches no handler to its logger"""
+        # exercise --------------------
+        handlers = pptx.packaging.log.handlers
+        # verify ----------------------
+        msg = "expected no handlers, got %s" % handlers
+        self.assertEqual([], handlers, msg)
+
     def test_open_returns_self(self):
         """Package.open() returns self-reference"""
         for file in (dir_pkg_path, zip_pkg_path, open(zip_pkg_path)):
@@ -531,6 +613,18 @@ class TestPartTypeSpec(TestCase):
         with self.assertRaises(KeyError):
             PartTypeSpec(content_type)
 
+    def test_pickle_returns_cached_instance(self):
+        """Unpickled PartTypeSpec is the cached instance"""
+        # setup -----------------------
+        content_type = 'application/vnd.openxmlformats-officedocument.'\
+                       'presentationml.slide+xml'
+        pts = PartTypeSpec(content_type)
+        # exercise --------------------
+        for protocol in range(pickle.HIGHEST_PROTOCOL+1):
+            unpickled = pickle.loads(pickle.dumps(pts, protocol))
+            # verify ------------------
+            self.assertIs(unpickled, pts)
+
     def test_format_correct(self):
         """PartTypeSpec.format returns correct value"""
         # setup -----------------------
@@ -553,6 +647,60 @@ class TestPartTypeSpec(TestCase):
             self.assertEqual(expected, actual, msg)
 
 
+class TestProbe(TestCase):
+    """Test probe()"""
+    def test_reads_presentation_summary(self):
+        """probe() reads slide count, size, layout names and properties"""
+        # exercise --------------------
+        info = probe(test_pptx_path)
+        # verify ----------------------
+        expected = (1, 9144000, 6858000, 11, 'Title Slide', 'Blank')
+        actual = (info.slide_count, info.slide_width, info.slide_height,
+                  len(info.layout_names), info.layout_names[0],
+                  info.layout_names[6])
+        msg = "expected %s, got %s" % (expected, actual)
+        self.assertEqual(expected, actual, msg)
+        self.assertEqual('python-pptx', info.core_properties['creator'])
+        self.assertEqual('4', info.core_properties['revision'])
+
+    def test_reads_master_only_as_far_as_layout_list(self):
+        """probe() stops parsing a slide master after its layout list"""
+        # setup -----------------------
+        # a master that isn't well-formed past its layout list can only be
+        # probed by a parser that stops there
+        master_name = 'ppt/slideMasters/slideMaster1.xml'
+        stream = StringIO()
+        src, dst = ZipFile(test_pptx_path), ZipFile(stream, 'w')
+        for name in src.namelist():
+            xml = src.read(name)
+            if name == master_name:
+                xml = xml.replace('</p:sldLayoutIdLst>',
+                                  '</p:sldLayoutIdLst><p:broken>', 1)
+            dst.writestr(name, xml)
+        dst.close()
+        # exercise --------------------
+        info = probe(stream)
+        # verify ----------------------
+        self.assertEqual(11, len(info.layout_names))
+
+    def test_is_exported_from_package(self):
+        """probe() is available as pptx.probe()"""
+        self.assertIs(probe, pptx.probe)
+
+    def test_reads_slide_count_of_new_presentation(self):
+        """probe() reports slides added to a saved presentation"""
+        # setup -----------------------
+        prs = pptx.Presentation()
+        prs.slides.add_slide(prs.slidelayouts[0])
+        prs.slides.add_slide(prs.slidelayouts[1])
+        stream = StringIO()
+        prs.save(stream)
+        # exercise --------------------
+        info = probe(stream)
+        # verify ----------------------
+        self.assertEqual(2, info.slide_count)
+
+
 class TestRelationship(TestCase):
     """Test Relationship"""
     def setUp(self):
@@ -566,6 +714,33 @@ class TestRelationship(TestCase):
         self.rel_xml = tmpl % (self.rId, self.reltype, self.target)
         self.rel_elm = etree.fromstring(self.rel_xml)
 
+    def test__relsitem_xml_escapes_attribute_values(self):
+        """_relsitem_xml() escapes and encodes attribute values"""
+        # setup -----------------------
+        source = Mock(spec=Part, partname='/ppt/slides/slide1.xml')
+        target = Mock(spec=Part, partname=u'/ppt/media/a&b \u00e9".png')
+        rel = Relationship('rId1', source, 'http://x/image', target)
+        # exercise --------------------
+        xml = _relsitem_xml([rel])
+        # verify ----------------------
+        element = etree.Element(qtag('pr:Relationships'),
+                                nsmap={None: pptx.spec.nsmap['pr']})
+        rel_elm = etree.SubElement(element, 'Relationship')
+        rel_elm.set('Id', 'rId1')
+        rel_elm.set('Type', 'http://x/image')
+        rel_elm.set('Target', u'../media/a&b \u00e9".png')
+        expected = etree.tostring(element, encoding='UTF-8',
+                                  pretty_print=True, standalone=True)
+        self.assertEqual(expected, xml)
+
+    def test__relsitem_xml_with_no_relationships(self):
+        """_relsitem_xml() of no relationships is an empty root element"""
+        # exercise --------------------
+        xml = _relsitem_xml([])
+        # verify ----------------------
+        self.assertTrue(xml.endswith('<Relationships xmlns="%s"/>\n'
+                                     % pptx.spec.nsmap['pr']))
+
     # def test_construction_correct_attr_values(self):
     #     """Relationship attributes loaded from ElementTree.Element"""
     #     # exercise --------------------
@@ -607,6 +782,94 @@ class TestZipFileSystem(TestCase):
         if os.path.isfile(test_save_pptx_path):
             os.remove(test_save_pptx_path)
 
+    def test_append_updates_package_in_place(self):
+        """ZipFileSystem in mode 'a' writes only new and changed items"""
+        # setup -----------------------
+        stream = StringIO()
+        zipf = ZipFile(stream, 'w')
+        for name in ('keep.xml', 'change.xml', 'remove.xml'):
+            zipf.writestr(name, 'old %s' % name)
+        zipf.close()
+        keep_offset = ZipFile(stream).getinfo('keep.xml').header_offset
+        # exercise --------------------
+        zipfs = ZipFileSystem(stream, 'a')
+        zipfs.write_blob('old keep.xml', '/keep.xml')
+        zipfs.write_blob('new change.xml', '/change.xml')
+        zipfs.write_blob('new add.xml', '/add.xml')
+        zipfs.close()
+        # verify ----------------------
+        zipf = ZipFile(stream)
+        self.assertIsNone(zipf.testzip())
+        expected = {'keep.xml': 'old keep.xml',
+                    'change.xml': 'new change.xml',
+                    'add.xml': 'new add.xml'}
+        actual = dict((name, zipf.read(name)) for name in zipf.namelist())
+        self.assertEqual(expected, actual)
+        self.assertEqual(keep_offset, zipf.getinfo('keep.xml').header_offset)
+
+    def test_append_with_no_changes_leaves_package_intact(self):
+        """ZipFileSystem in mode 'a' with no items changed keeps package"""
+        # setup -----------------------
+        stream = StringIO()
+        zipf = ZipFile(stream, 'w')
+        zipf.writestr('keep.xml', 'keep.xml')
+        zipf.close()
+        bytes_ = stream.getvalue()
+        # exercise --------------------
+        zipfs = ZipFileSystem(stream, 'a')
+        zipfs.write_blob('keep.xml', '/keep.xml')
+        zipfs.close()
+        # verify ----------------------
+        self.assertEqual('keep.xml', ZipFile(stream).read('keep.xml'))
+        self.assertEqual(bytes_, stream.getvalue())
+
+    def test_append_with_items_only_dropped(self):
+        """ZipFileSystem in mode 'a' drops items when none are changed"""
+        # setup -----------------------
+        stream = StringIO()
+        zipf = ZipFile(stream, 'w')
+        for name in ('keep.xml', 'remove.xml'):
+            zipf.writestr(name, 'old %s' % name)
+        zipf.close()
+        # exercise --------------------
+        zipfs = ZipFileSystem(stream, 'a')
+        zipfs.write_blob('old keep.xml', '/keep.xml')
+        zipfs.close()
+        # verify ----------------------
+        zipf = ZipFile(stream)
+        self.assertIsNone(zipf.testzip())
+        self.assertEqual(['keep.xml'], zipf.namelist())
+        self.assertEqual('old keep.xml', zipf.read('keep.xml'))
+
+    def test_append_raises_on_not_a_package(self):
+        """ZipFileSystem in mode 'a' raises when file isn't a zip archive"""
+        with self.assertRaises(PackageNotFoundError):
+            ZipFileSystem(StringIO('not a zip archive'), 'a')
+
+    def test_writes_zip64_package(self):
+        """ZipFileSystem writes a package needing ZIP64 extensions"""
+        # setup -----------------------
+        # shrink the limits so a small package needs ZIP64 to stand in for
+        # a multi-gigabyte one with tens of thousands of items
+        stream = StringIO()
+        blob = 'x' * 2048
+        # exercise --------------------
+        with patch.multiple(zipfile, ZIP64_LIMIT=1024,
+                            ZIP_FILECOUNT_LIMIT=4):
+            zipfs = ZipFileSystem(stream, 'w')
+            for idx in range(8):
+                zipfs.write_blob(blob, '/ppt/media/image%d.png' % idx)
+            zipfs.close()
+            zipfs = ZipFileSystem(stream, 'a')
+            for idx in range(9):
+                zipfs.write_blob(blob, '/ppt/media/image%d.png' % idx)
+            zipfs.close()
+        # verify ----------------------
+        zipf = ZipFile(stream)
+        self.assertIsNone(zipf.testzip())
+        self.assertEqual(9, len(zipf.namelist()))
+        self.assertEqual(blob, zipf.read('ppt/media/image8.png'))
+
     def test_constructor_accepts_stream(self):
         """ZipFileSystem() constructor accepts zip archive as stream"""
         with open(zip_pkg_path) as stream:
@@ -713,3 +976,38 @@ class TestZipFileSystem(TestCase):
         # verify ----------------------
         with self.assertRaises(DuplicateKeyError):
             zipfs.write_element(elm, itemURI)
+
+    def test_writes_zip_entry_blob_without_reading_it(self):
+        """ZipFileSystem writes a zip entry Blob without reading it whole"""
+        # setup -----------------------
+        path = absjoin(test_file_dir, 'with_images.pptx')
+        zipf = ZipFile(path)
+        media = [name for name in zipf.namelist() if 'media' in name][0]
+        blob = blobstore.from_zip_entry(path, zipf.getinfo(media))
+        stream = StringIO()
+        # exercise --------------------
+        with patch.object(blobstore.Blob, 'read') as read:
+            zipfs = ZipFileSystem(stream, 'w')
+            zipfs.write_blob(blob, '/%s' % media)
+            zipfs.close()
+        # verify ----------------------
+        self.assertFalse(read.called)
+        self.assertEqual(zipf.read(media), ZipFile(stream).read(media))
+
+    def test_writes_shared_blob(self):
+        """ZipFileSystem writes a Blob shared by more than one item"""
+        # setup -----------------------
+        stream = StringIO()
+        bytes_ = os.urandom(2048)
+        blob = blobstore.shared(bytes_)
+        # exercise --------------------
+        with patch.object(zipfile, 'ZIP64_LIMIT', 1024):
+            zipfs = ZipFileSystem(stream, 'w')
+            zipfs.write_blob(blob, '/ppt/media/image1.png')
+            zipfs.write_blob(blob, '/ppt/media/image2.png')
+            zipfs.close()
+        # verify ----------------------
+        zipf = ZipFile(stream)
+        self.assertIsNone(zipf.testzip())
+        self.assertEqual([bytes_, bytes_], [zipf.read(name) for name in
+                                            zipf.namelist()])
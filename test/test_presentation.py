@@ -11,7 +11,9 @@
 
 import gc
 import os
+import pickle
 import re
+import threading
 
 from hamcrest import assert_that, is_, is_in, is_not, equal_to
 from StringIO import StringIO
@@ -27,6 +29,7 @@ import pptx.presentation
 
 from pptx.constants import MSO
 from pptx.exceptions import InvalidPackageError
+from pptx.instrument import Recorder
 
 from pptx.oxml import _SubElement, oxml_fromstring, oxml_tostring, oxml_parse
 
@@ -247,6 +250,25 @@ class TestBasePart(TestCase):
         msg = "expected: \n'%s'\n, got \n'%s'" % (expected, actual)
         self.assertEqual(expected, actual, msg)
 
+    def test__blob_reused_until_element_handed_out(self):
+        """BasePart._blob is serialized again only after a change"""
+        # setup -----------------------
+        pkgpart = Mock(name='pptx.packaging.Part')
+        pkgpart.partname = '/ppt/presentation.xml'
+        pkgpart.blob = '<root><elm1 attr="spam"/></root>'
+        pkgpart.relationships = []
+        part = self.basepart._load(pkgpart, {})
+        blob = part._blob
+        # exercise --------------------
+        unchanged_blob = part._blob
+        part._element[0].set('attr', 'eggs')
+        changed_blob = part._blob
+        # verify ----------------------
+        self.assertIs(blob, unchanged_blob)
+        self.assertIn('attr="eggs"', changed_blob)
+        part._element[0].set('attr', 'ham')
+        self.assertIn('attr="ham"', part._blob)
+
     def test__content_type_raises_on_accessed_before_assigned(self):
         """BasePart._content_type raises on access before assigned"""
         with self.assertRaises(ValueError):
@@ -443,6 +465,21 @@ class TestBaseSlide(TestCase):
         # verify ----------------------
         self.assertLength(shapes, 9)
 
+    def test__load_defers_shapes(self):
+        """BaseSlide._load() doesn't unmarshal shapes"""
+        # setup -----------------------
+        path = os.path.join(thisdir, 'test_files/slide1.xml')
+        pkgpart = Mock(name='pptx.packaging.Part')
+        pkgpart.partname = '/ppt/slides/slide1.xml'
+        with open(path, 'r') as f:
+            pkgpart.blob = f.read()
+        pkgpart.relationships = []
+        # exercise --------------------
+        with patch('pptx.presentation.ShapeCollection') as ShapeCollection:
+            self.base_slide._load(pkgpart, {})
+        # verify ----------------------
+        self.assertFalse(ShapeCollection.called)
+
 
 class TestCollection(TestCase):
     """Test Collection"""
@@ -576,6 +613,18 @@ class TestImage(TestCase):
         assert_that(image._content_type, is_(equal_to('image/jpeg')))
         assert_that(len(image._blob), is_(equal_to(3277)))
 
+    def test_images_with_same_bytes_share_blob(self):
+        """Images with the same bytes share one blob across packages"""
+        # setup -----------------------
+        with open(test_image_path) as f:
+            stream = StringIO(f.read())
+        # exercise --------------------
+        images = [Package()._images.add_image(test_image_path),
+                  Package()._images.add_image(stream)]
+        # verify ----------------------
+        self.assertIs(images[0]._blobref, images[1]._blobref)
+        self.assertEqual(['.jpeg', '.jpg'], [image.ext for image in images])
+
     def test_construction_from_file_raises_on_bad_path(self):
         """Image(path) constructor raises on bad path"""
         # verify ----------------------
@@ -717,6 +766,143 @@ class TestPackage(TestCase):
         msg = "expected image count of %d, got %d" % (expected, actual)
         self.assertEqual(expected, actual, msg)
 
+    def test_collect_garbage_removes_unreferenced_images(self):
+        """Package.collect_garbage() removes images no part references"""
+        # setup -----------------------
+        pkg = Package(images_pptx_path)
+        slide2, slide3 = pkg.presentation.slides[1:3]
+        for slide in (slide2, slide3):
+            pic = slide._element.xpath('//p:pic', namespaces=nsmap)[0]
+            pic.getparent().remove(pic)
+        image4 = slide3._relationships.rels_of_reltype(RT_IMAGE)[0]._target
+        part_count = len(pkg._parts)
+        # exercise --------------------
+        reclaimed = pkg.collect_garbage()
+        # verify ----------------------
+        self.assertEqual(image4._blobref.size, reclaimed)
+        self.assertEqual(part_count-1, len(pkg._parts))
+        self.assertNotIn(image4, pkg._images)
+        self.assertEqual(1, len(slide2._relationships.rels_of_reltype(
+            RT_IMAGE)))
+        self.assertEqual(0, pkg.collect_garbage())
+
+    def test_dedupe_media_collapses_identical_images(self):
+        """Package.dedupe_media() retargets duplicate images to one image"""
+        # setup -----------------------
+        pkg = Package(images_pptx_path)
+        image = pkg._images[4]
+        duplicate = Image(test_image_path)
+        duplicate.partname = '/ppt/media/image8.jpeg'
+        slide = pkg.presentation.slides[0]
+        rel = slide._add_relationship(RT_IMAGE, duplicate)
+        pkg._images._loadpart(duplicate)
+        part_count = len(pkg._parts)
+        # exercise --------------------
+        reclaimed = pkg.dedupe_media()
+        # verify ----------------------
+        self.assertEqual(duplicate._blobref.size, reclaimed)
+        self.assertEqual(part_count-1, len(pkg._parts))
+        self.assertNotIn(duplicate, pkg._images)
+        retargeted = slide._relationships.rels_of_reltype(RT_IMAGE)[-1]
+        self.assertEqual(rel._rId, retargeted._rId)
+        self.assertIs(image, retargeted._target)
+
+    def test_parallel_parse_is_opt_in(self):
+        """Package parses XML parts on the loading thread by default"""
+        # exercise --------------------
+        with patch('pptx.presentation._parse_pool') as _parse_pool:
+            Package(test_pptx_path)
+        # verify ----------------------
+        self.assertFalse(_parse_pool.called)
+
+    def test_parallel_parse_reuses_pool_threads(self):
+        """Package loads parsed in parallel share one pool of threads"""
+        # setup -----------------------
+        with patch.object(Package, 'parse_threads', 4):
+            with patch('pptx.presentation._PARALLEL_PARSE_MIN_BYTES', 0):
+                Package(test_pptx_path)
+                thread_count = threading.active_count()
+                # exercise --------------------
+                with patch('pptx.presentation._parse_xml_part',
+                           side_effect=ValueError('bad part')):
+                    with self.assertRaises(ValueError):
+                        Package(test_pptx_path)
+                Package(test_pptx_path)
+        # verify ----------------------
+        self.assertEqual(thread_count, threading.active_count())
+
+    def test_parallel_parse_loads_same_parts(self):
+        """Package parsed on a thread pool matches one parsed serially"""
+        # setup -----------------------
+        def xml_parts(pkg):
+            return dict((part.partname, oxml_tostring(part._element))
+                        for part in pkg._parts
+                        if part.partname.endswith('.xml'))
+        expected = xml_parts(Package(test_pptx_path))
+        # exercise --------------------
+        with patch.object(Package, 'parse_threads', 4):
+            with patch('pptx.presentation._PARALLEL_PARSE_MIN_BYTES', 0):
+                with patch('pptx.presentation._parse_pool',
+                           wraps=pptx.presentation._parse_pool) as _parse_pool:
+                    pkg = Package(test_pptx_path)
+        # verify ----------------------
+        _parse_pool.assert_called_once_with(4)
+        actual = xml_parts(pkg)
+        msg = "\nExpected: %s\n     Got: %s" % (sorted(expected),
+                                                 sorted(actual))
+        self.assertEqual(expected, actual, msg)
+
+    def test_resave_serializes_only_changed_parts(self):
+        """Package.save() again serializes only the parts changed"""
+        # setup -----------------------
+        pkg = Package(test_pptx_path)
+        pkg.save(StringIO())
+        slide = pkg.presentation.slides[0]
+        # exercise --------------------
+        with Recorder() as unchanged:
+            pkg.save(StringIO())
+        slide.shapes[0].text = 'changed'
+        with Recorder() as changed:
+            pkg.save(StringIO())
+        # verify ----------------------
+        def serialized(recorder):
+            return [event['partname'] for event in recorder.events
+                    if event['name'] == 'serialize']
+        self.assertEqual([], serialized(unchanged))
+        self.assertEqual([slide.partname], serialized(changed))
+
+    def test_save_append_adds_slide_in_place(self):
+        """Package.save(append=True) updates an existing package file"""
+        # setup -----------------------
+        with open(images_pptx_path, 'rb') as f:
+            stream = StringIO(f.read())
+        pkg = Package(stream)
+        slide_count = len(pkg.presentation.slides)
+        layout = pkg.presentation.slidemasters[0].slidelayouts[0]
+        pkg.presentation.slides.add_slide(layout)
+        # exercise --------------------
+        pkg.save(stream, append=True)
+        # verify ----------------------
+        slides = Package(stream).presentation.slides
+        self.assertEqual(slide_count+1, len(slides))
+
+    def test_pickle_round_trip(self):
+        """Package survives a pickle round-trip"""
+        # setup -----------------------
+        pkg = Package(test_pptx_path)
+        # exercise --------------------
+        clone = pickle.loads(pickle.dumps(pkg, pickle.HIGHEST_PROTOCOL))
+        # verify ----------------------
+        expected = (len(pkg.presentation.slides),
+                    [sld.partname for sld in pkg.presentation.slides])
+        actual = (len(clone.presentation.slides),
+                  [sld.partname for sld in clone.presentation.slides])
+        msg = "\nExpected: %s\n     Got: %s" % (expected, actual)
+        self.assertEqual(expected, actual, msg)
+        self.assertIn(clone, Package.instances())
+        slide = clone.presentation.slides[0]
+        self.assertIs(Package.containing(slide), clone)
+
     def test_presentation_presentation_after_open(self):
         """Package.presentation is instance of Presentation after open()"""
         # setup -----------------------
@@ -776,6 +962,19 @@ class TestParagraph(TestCase):
         msg = "expected run count %s, got %s" % (expected, actual)
         self.assertEqual(expected, actual, msg)
 
+    def test_iter_runs_generates_runs(self):
+        """Paragraph.iter_runs() generates a Run for each run"""
+        # setup -----------------------
+        paragraph = Paragraph(self.pList[2])
+        # exercise --------------------
+        runs = paragraph.iter_runs()
+        # verify ----------------------
+        self.assertFalse(isinstance(runs, (list, tuple)))
+        runs = list(runs)
+        self.assertLength(runs, 2)
+        for run in runs:
+            self.assertIsInstance(run, Run)
+
     def test_add_run_increments_run_count(self):
         """Paragraph.add_run() increments run count"""
         # setup -----------------------
@@ -945,6 +1144,18 @@ class TestPartCollection(TestCase):
 
 class TestPlaceholder(TestCase):
     """Test Placeholder"""
+    def test_decorator_class_is_reused(self):
+        """Placeholder reuses decorator class for same shape class"""
+        # setup -----------------------
+        shapes = _sldLayout1_shapes()
+        # exercise --------------------
+        ph1 = Placeholder(shapes[0])
+        ph2 = Placeholder(shapes[1])
+        # verify ----------------------
+        self.assertIs(type(ph1), type(ph2))
+        self.assertIsInstance(ph1, Placeholder)
+        self.assertIsInstance(ph1, Shape)
+
     def test_property_values(self):
         """Placeholder property values are correct"""
         # setup -----------------------
@@ -968,6 +1179,17 @@ class TestPlaceholder(TestCase):
                    % (idx, expected, actual)
             self.assertEqual(expected, actual, msg)
 
+    def test_property_values_follow_xml(self):
+        """Placeholder property values reflect later changes to the XML"""
+        # setup -----------------------
+        ph = Placeholder(_sldLayout1_shapes()[0])
+        ph_elm = ph._element.xpath('./*[1]/p:nvPr/p:ph', namespaces=nsmap)[0]
+        # exercise --------------------
+        ph_elm.set('type', PH_TYPE_TITLE)
+        ph_elm.set('idx', '7')
+        # verify ----------------------
+        self.assertEqual((PH_TYPE_TITLE, 7), (ph.type, ph.idx))
+
 
 class TestPresentation(TestCase):
     """Test Presentation"""
@@ -1333,6 +1555,64 @@ class TestShapeCollection(TestCase):
         # verify ----------------------
         self.assertLength(self.shapes, 9)
 
+    def test_by_id_and_by_name_return_shape(self):
+        """ShapeCollection.by_id() and by_name() find the right shape"""
+        # exercise --------------------
+        shape_by_id = self.shapes.by_id(7)
+        shape_by_name = self.shapes.by_name('TextBox 6')
+        # verify ----------------------
+        self.assertIs(shape_by_id, self.shapes[3])
+        self.assertIs(shape_by_name, self.shapes[3])
+        with self.assertRaises(KeyError):
+            self.shapes.by_id(9)  # nested in a group shape
+        with self.assertRaises(KeyError):
+            self.shapes.by_name('Foobar 42')
+
+    def test_placeholder_returns_placeholder_with_idx(self):
+        """ShapeCollection.placeholder(idx) finds placeholder by idx"""
+        # exercise --------------------
+        title = self.shapes.placeholder(0)
+        body = self.shapes.placeholder(1)
+        # verify ----------------------
+        self.assertEqual(('Title 1', 'Content Placeholder 2'),
+                         (title.name, body.name))
+        self.assertIsInstance(body, Placeholder)
+        with self.assertRaises(KeyError):
+            self.shapes.placeholder(2)
+
+    def test_lookup_index_includes_added_shapes(self):
+        """ShapeCollection lookups find shapes added after first use"""
+        # setup -----------------------
+        self.shapes.by_id(2)
+        # exercise --------------------
+        textbox = self.shapes.add_textbox(0, 0, 0, 0)
+        # verify ----------------------
+        self.assertIs(textbox, self.shapes.by_id(textbox.id))
+        self.assertIs(textbox, self.shapes.by_name(textbox.name))
+
+    def test_getitem_creates_only_that_shape(self):
+        """ShapeCollection[i] creates shape object for that shape only"""
+        # exercise --------------------
+        shape = self.shapes[2]
+        # verify ----------------------
+        values = self.shapes._values
+        self.assertIs(shape, values[2])
+        self.assertIs(shape, self.shapes[2])
+        created = [isinstance(value, BaseShape) for value in values]
+        expected = [False, False, True] + [False] * 6
+        msg = "expected %s, got %s" % (expected, created)
+        self.assertEqual(expected, created, msg)
+
+    def test_iteration_creates_shapes_of_right_type(self):
+        """ShapeCollection iteration produces shape objects"""
+        # exercise --------------------
+        shapes = list(self.shapes)
+        # verify ----------------------
+        self.assertLength(shapes, 9)
+        for shape in shapes:
+            self.assertIsInstance(shape, BaseShape)
+        self.assertEqual(shapes[-2:], self.shapes[-2:])
+
     @patch('pptx.presentation.Picture')
     @patch('pptx.presentation.Collection._values', new_callable=PropertyMock)
     @patch('pptx.presentation.Package')
@@ -1372,6 +1652,66 @@ class TestShapeCollection(TestCase):
         Picture.assert_called_once_with(pic)
         shapes._values.append.assert_called_once_with(picture)
 
+    def test_add_picture_downsamples_to_dpi(self):
+        """ShapeCollection.add_picture(dpi=n) embeds a downsampled image"""
+        # setup -----------------------
+        stream = StringIO()
+        PILImage.new('RGB', (2000, 1000), 'red').save(stream, 'JPEG')
+        pkg = Package()
+        prs = pkg.presentation
+        slide = prs.slides.add_slide(prs.slidemasters[0].slidelayouts[6])
+        # exercise --------------------
+        with patch('pptx.presentation._encode_image',
+                   wraps=pptx.presentation._encode_image) as _encode_image:
+            pictures = [slide.shapes.add_picture(stream, 0, 0, Inches(2),
+                                                 Inches(1), dpi=100)
+                        for idx in range(2)]
+        # verify ----------------------
+        image = slide._relationships.rels_of_reltype(RT_IMAGE)[0]._target
+        self.assertEqual((200, 100), PILImage.open(StringIO(image._blob)).size)
+        self.assertEqual(1, _encode_image.call_count)
+        ext = pictures[1]._element.xpath('.//a:ext', namespaces=nsmap)[0]
+        self.assertEqual(str(Inches(2)), ext.get('cx'))
+
+    def test_add_picture_keeps_jpeg_orientation(self):
+        """ShapeCollection.add_picture(dpi=n) keeps JPEG EXIF and profile"""
+        # setup -----------------------
+        # EXIF data holding only Orientation = 6, rotated 90 degrees
+        exif = ('Exif\x00\x00MM\x00*\x00\x00\x00\x08\x00\x01'
+                '\x01\x12\x00\x03\x00\x00\x00\x01\x00\x06\x00\x00'
+                '\x00\x00\x00\x00')
+        icc_profile = 'stand-in ICC profile'
+        stream = StringIO()
+        PILImage.new('RGB', (2000, 1000), 'red').save(
+            stream, 'JPEG', exif=exif, icc_profile=icc_profile)
+        pkg = Package()
+        prs = pkg.presentation
+        slide = prs.slides.add_slide(prs.slidemasters[0].slidelayouts[6])
+        # exercise --------------------
+        slide.shapes.add_picture(stream, 0, 0, Inches(2), Inches(1), dpi=100)
+        # verify ----------------------
+        image = slide._relationships.rels_of_reltype(RT_IMAGE)[0]._target
+        embedded = PILImage.open(StringIO(image._blob))
+        self.assertEqual((200, 100), embedded.size)
+        self.assertEqual(6, embedded._getexif()[0x0112])
+        self.assertEqual(icc_profile, embedded.info.get('icc_profile'))
+
+    def test_add_picture_keeps_png_palette(self):
+        """ShapeCollection.add_picture(dpi=n) keeps a PNG palette image"""
+        # setup -----------------------
+        stream = StringIO()
+        PILImage.new('P', (2000, 1000), 1).save(stream, 'PNG')
+        pkg = Package()
+        prs = pkg.presentation
+        slide = prs.slides.add_slide(prs.slidemasters[0].slidelayouts[6])
+        # exercise --------------------
+        slide.shapes.add_picture(stream, 0, 0, Inches(2), Inches(1), dpi=100)
+        # verify ----------------------
+        image = slide._relationships.rels_of_reltype(RT_IMAGE)[0]._target
+        embedded = PILImage.open(StringIO(image._blob))
+        self.assertEqual((200, 100), embedded.size)
+        self.assertEqual('P', embedded.mode)
+
     @patch('pptx.presentation.Collection._values', new_callable=PropertyMock)
     @patch('pptx.presentation.Shape')
     @patch('pptx.presentation.ShapeCollection._ShapeCollection__next_shape_id'
@@ -1457,6 +1797,57 @@ class TestShapeCollection(TestCase):
                    % (idx, expected, actual)
             self.assertEqual(expected, actual, msg)
 
+    def test__clone_layout_placeholders_caches_prototypes(self):
+        """_clone_layout_placeholders() reuses cached layout placeholders"""
+        # setup -----------------------
+        slidelayout = SlideLayout()
+        slidelayout._shapes = _sldLayout1_shapes()
+        ShapeCollection(_empty_spTree())._clone_layout_placeholders(
+            slidelayout)
+        shapes = ShapeCollection(_empty_spTree())
+        # exercise --------------------
+        with patch.object(ShapeCollection,
+                          '_ShapeCollection__clone_layout_placeholder') as m:
+            shapes._clone_layout_placeholders(slidelayout)
+        # verify ----------------------
+        self.assertFalse(m.called)
+        expected = ['Title 1', 'Vertical Subtitle 2', 'Table Placeholder 3']
+        actual = [sp.name for sp in shapes]
+        msg = "expected %s, got %s" % (expected, actual)
+        self.assertEqual(expected, actual, msg)
+
+    def test__clone_layout_placeholders_recaches_on_layout_change(self):
+        """_clone_layout_placeholders() recaches when layout changes"""
+        # setup -----------------------
+        slidelayout = SlideLayout()
+        slidelayout._shapes = _sldLayout1_shapes()
+        ShapeCollection(_empty_spTree())._clone_layout_placeholders(
+            slidelayout)
+        ph = slidelayout.shapes[0]._element.xpath(
+            './*[1]/p:nvPr/p:ph', namespaces=nsmap)[0]
+        ph.set('type', PH_TYPE_TITLE)
+        shapes = ShapeCollection(_empty_spTree())
+        # exercise --------------------
+        shapes._clone_layout_placeholders(slidelayout)
+        # verify ----------------------
+        expected = PH_TYPE_TITLE
+        actual = Placeholder(shapes[0]).type
+        msg = "expected %s, got %s" % (expected, actual)
+        self.assertEqual(expected, actual, msg)
+
+    def test__clone_layout_placeholders_leaves_layout_unchanged(self):
+        """_clone_layout_placeholders() doesn't mark the layout changed"""
+        # setup -----------------------
+        pkg = Package()
+        slidelayout = pkg.presentation.slidemasters[0].slidelayouts[1]
+        # exercise --------------------
+        for idx in range(2):
+            shapes = ShapeCollection(_empty_spTree())
+            shapes._clone_layout_placeholders(slidelayout)
+        # verify ----------------------
+        self.assertFalse(slidelayout._live)
+        self.assertIsNotNone(slidelayout._placeholder_prototypes)
+
     def test__clone_layout_placeholders_shapes(self):
         """ShapeCollection._clone_layout_placeholders clones shapes"""
         # setup -----------------------
@@ -1917,6 +2308,30 @@ class TestTextFrame(TestCase):
         msg = "expected paragraph count %s, got %s" % (expected, actual)
         self.assertEqual(expected, actual, msg)
 
+    def test_iter_paragraphs_generates_paragraphs(self):
+        """TextFrame.iter_paragraphs() generates a Paragraph for each one"""
+        # setup -----------------------
+        textframe = TextFrame(self.txBodyList[2])
+        # exercise --------------------
+        paragraphs = textframe.iter_paragraphs()
+        # verify ----------------------
+        self.assertFalse(isinstance(paragraphs, (list, tuple)))
+        paragraphs = list(paragraphs)
+        self.assertLength(paragraphs, 2)
+        for paragraph in paragraphs:
+            self.assertIsInstance(paragraph, Paragraph)
+
+    def test_text_objects_have_no_instance_dict(self):
+        """TextFrame, Paragraph, Run and _Font objects use slots"""
+        # setup -----------------------
+        textframe = TextFrame(self.txBodyList[2])
+        paragraph = textframe.paragraphs[0]
+        run = paragraph.runs[0]
+        # verify ----------------------
+        for obj in (textframe, paragraph, run, run.font):
+            msg = "expected no __dict__ on %r" % obj
+            self.assertFalse(hasattr(obj, '__dict__'), msg)
+
     def test_add_paragraph_xml(self):
         """TextFrame.add_paragraph does what it says"""
         # setup -----------------------